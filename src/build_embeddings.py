@@ -25,6 +25,22 @@ except ImportError:
 # Default model - small and fast, good for semantic search
 DEFAULT_MODEL = "all-MiniLM-L6-v2"
 
+# Below this many items an exact flat index is both fast and lossless;
+# above it "auto" switches to IVF-PQ FastScan (4-bit PQ with SIMD LUT scans)
+FASTSCAN_MIN_ITEMS = 10000
+
+# FAISS index_factory strings. RFlat re-ranks the PQ candidates with exact
+# inner products so reported scores stay true cosine similarities.
+PQ_FASTSCAN_FACTORY = "PQ32x4fs,RFlat"
+IVF_PQ_FASTSCAN_FACTORY = "IVF256,PQ32x4fs,RFlat"
+# Candidates re-ranked per requested result (persisted with the index)
+FASTSCAN_REFINE_K_FACTOR = 8
+
+# HNSW graph: links per node and build-time candidate list size. Vectors are
+# stored uncompressed, so scores stay exact cosine similarities.
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+
 
 def get_index_dir() -> Path:
     """Get the index directory path."""
@@ -201,20 +217,82 @@ def build_embeddings(items: List[Dict], model_name: str = DEFAULT_MODEL) -> Tupl
     return embeddings, items
 
 
-def build_faiss_index(embeddings: np.ndarray) -> faiss.IndexFlatIP:
-    """Build a FAISS index for fast similarity search."""
+def build_faiss_index(embeddings: np.ndarray, index_type: str = "auto") -> faiss.Index:
+    """Build a FAISS index for fast similarity search.
+
+    index_type is "flat" (exact), "sq8" (exhaustive over 8-bit scalar-quantized
+    vectors), "fastscan" (PQ FastScan, IVF-partitioned for large corpora),
+    "hnsw" (graph search over uncompressed vectors) or "auto" (flat below
+    FASTSCAN_MIN_ITEMS, else fastscan).
+    """
     # Normalize embeddings for cosine similarity
     faiss.normalize_L2(embeddings)
 
-    # Create index (Inner Product = cosine similarity after normalization)
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dimension)
+    count, dimension = embeddings.shape
+    if index_type == "auto":
+        index_type = "fastscan" if count >= FASTSCAN_MIN_ITEMS else "flat"
+
+    if index_type == "flat":
+        # Create index (Inner Product = cosine similarity after normalization)
+        index = faiss.IndexFlatIP(dimension)
+    elif index_type == "sq8":
+        # One byte per dimension: a quarter of the fp32 memory traffic per scan
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit,
+                                           faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    else:
+        factory = IVF_PQ_FASTSCAN_FACTORY if count >= FASTSCAN_MIN_ITEMS else PQ_FASTSCAN_FACTORY
+        print(f"[INFO] Training FAISS index: {factory}")
+        index = faiss.index_factory(dimension, factory, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+        index.k_factor = FASTSCAN_REFINE_K_FACTOR
+
     index.add(embeddings)
 
     return index
 
 
-def save_embeddings(embeddings: np.ndarray, items: List[Dict], index_dir: Path):
+def export_onnx_model(model_name: str, index_dir: Path) -> bool:
+    """Export the encoder to a dynamically int8-quantized ONNX model.
+
+    Writes embeddings/onnx/model.onnx plus tokenizer files, which the server
+    loads with ONNX Runtime in place of the PyTorch SentenceTransformer.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+    except ImportError:
+        print("[WARN] ONNX export requires: pip install optimum[onnxruntime]")
+        return False
+
+    import tempfile
+
+    # Short sentence-transformers names live under the sentence-transformers org on the Hub
+    model_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    onnx_dir = index_dir / "embeddings" / "onnx"
+    onnx_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"[INFO] Exporting {model_id} to ONNX...")
+    with tempfile.TemporaryDirectory() as export_dir:
+        model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+        model.save_pretrained(export_dir)
+
+        quantizer = ORTQuantizer.from_pretrained(export_dir)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=onnx_dir, quantization_config=qconfig)
+
+    (onnx_dir / "model_quantized.onnx").replace(onnx_dir / "model.onnx")
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(onnx_dir)
+
+    print(f"[INFO] Saved quantized ONNX model to: {onnx_dir}")
+    return True
+
+
+def save_embeddings(embeddings: np.ndarray, items: List[Dict], index_dir: Path, index_type: str = "auto"):
     """Save embeddings and metadata."""
     embeddings_dir = index_dir / "embeddings"
     embeddings_dir.mkdir(exist_ok=True)
@@ -248,7 +326,7 @@ def save_embeddings(embeddings: np.ndarray, items: List[Dict], index_dir: Path):
 
     # Save FAISS index
     faiss.normalize_L2(embeddings)  # Re-normalize since we loaded from file
-    index = build_faiss_index(embeddings.copy())
+    index = build_faiss_index(embeddings.copy(), index_type)
     faiss.write_index(index, str(embeddings_dir / "faiss.index"))
 
     print(f"[INFO] Saved embeddings to: {embeddings_dir}")
@@ -260,6 +338,10 @@ def main():
     parser = argparse.ArgumentParser(description="Build semantic search embeddings")
     parser.add_argument("--model", default=DEFAULT_MODEL, help="Sentence transformer model name")
     parser.add_argument("--output-dir", default=None, help="Output directory (default: index/)")
+    parser.add_argument("--index-type", choices=["auto", "flat", "sq8", "fastscan", "hnsw"], default="auto",
+                        help=f"FAISS index type (auto: flat below {FASTSCAN_MIN_ITEMS} items, else IVF-PQ FastScan)")
+    parser.add_argument("--onnx", action="store_true",
+                        help="Also export an int8-quantized ONNX encoder for faster query embedding")
 
     args = parser.parse_args()
 
@@ -288,7 +370,10 @@ def main():
 
     # Save
     index_dir = Path(args.output_dir) if args.output_dir else get_index_dir()
-    save_embeddings(embeddings, items, index_dir)
+    save_embeddings(embeddings, items, index_dir, args.index_type)
+
+    if args.onnx:
+        export_onnx_model(args.model, index_dir)
 
     print("\n" + "=" * 60)
     print("[DONE] Embeddings built successfully")
@@ -1113,18 +1113,27 @@ Examples:
         log.info(f"API documentation written to: {output_path}")
 
         # Print summary
+        # (collected and written in one call - each print is a separate
+        # console write, which is slow on Windows)
         if not args.quiet:
-            print(f"\n[DONE] LibLCM Extraction Complete")
-            print(f"  Output: {output_path}")
-            print(f"  Types: {api_doc['metadata']['total_types']}")
-            print(f"  Interfaces: {api_doc['metadata']['total_interfaces']}")
-            print(f"  Classes: {api_doc['metadata']['total_classes']}")
-            print(f"  Methods: {api_doc['metadata']['total_methods']}")
-            print(f"  Properties: {api_doc['metadata']['total_properties']}")
-            print(f"  Relationships: {api_doc['metadata']['total_relationships']}")
-            print(f"\n  Categories:")
-            for cat, count in sorted(api_doc['metadata']['categories'].items()):
-                print(f"    {cat}: {count} types")
+            metadata = api_doc['metadata']
+            summary = [
+                "",
+                "[DONE] LibLCM Extraction Complete",
+                f"  Output: {output_path}",
+                f"  Types: {metadata['total_types']}",
+                f"  Interfaces: {metadata['total_interfaces']}",
+                f"  Classes: {metadata['total_classes']}",
+                f"  Methods: {metadata['total_methods']}",
+                f"  Properties: {metadata['total_properties']}",
+                f"  Relationships: {metadata['total_relationships']}",
+                "",
+                "  Categories:",
+            ]
+            for cat, count in sorted(metadata['categories'].items()):
+                summary.append(f"    {cat}: {count} types")
+            sys.stdout.write("\n".join(summary) + "\n")
+            sys.stdout.flush()
 
         return 0
 
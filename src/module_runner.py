@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""FlexTools Module Runner for FlexToolsMCP.
+
+Run by the run_module tool in a subprocess, either once per run:
+
+    python module_runner.py <config.json | ->
+
+or as a long-lived worker that keeps FLEx initialized between runs:
+
+    python module_runner.py --worker
+
+A run configuration holds PROJECT_NAME, WRITE_ENABLED, MODULE_CODE and
+optionally MAX_MESSAGES (how many of the most recent report messages to
+keep). "-" reads a single configuration from stdin. A one-shot result is
+printed as JSON on the line after a ===FLEXTOOLS_RESULT_JSON=== marker.
+
+The worker exchanges frames over stdin/stdout instead: a 4-byte
+little-endian length followed by that many bytes of UTF-8 JSON, one
+configuration in and one result out per run. Its runs share one
+interpreter; preserved_interpreter_state() lists what is reset between them.
+"""
+import sys
+import json
+import os
+import io
+import traceback
+import collections
+import contextlib
+import hashlib
+
+RESULT_MARKER = "===FLEXTOOLS_RESULT_JSON==="
+FRAME_HEADER_BYTES = 4
+DEFAULT_MAX_MESSAGES = 10000
+# Compiled module code kept by a worker, for re-runs of the same module
+MODULE_CODE_CACHE_SIZE = 32
+
+_compiled_modules = collections.OrderedDict()
+
+
+def compile_module(module_code):
+    """Compile module code, reusing the code object of an identical module."""
+    key = hashlib.blake2b(module_code.encode("utf-8"), digest_size=16).digest()
+    code = _compiled_modules.get(key)
+    if code is not None:
+        _compiled_modules.move_to_end(key)
+        return code
+
+    # Same filename as exec() of a string, so tracebacks are unchanged
+    code = compile(module_code, "<string>", "exec")
+    _compiled_modules[key] = code
+    if len(_compiled_modules) > MODULE_CODE_CACHE_SIZE:
+        _compiled_modules.popitem(last=False)
+    return code
+
+# ============================================================
+# Mock flextoolslib module (so module code can import from it)
+# ============================================================
+import types
+
+# Create fake flextoolslib module
+flextoolslib = types.ModuleType('flextoolslib')
+
+# FlexTools module documentation keys
+flextoolslib.FTM_Name = "FTM_Name"
+flextoolslib.FTM_Version = "FTM_Version"
+flextoolslib.FTM_ModifiesDB = "FTM_ModifiesDB"
+flextoolslib.FTM_Synopsis = "FTM_Synopsis"
+flextoolslib.FTM_Description = "FTM_Description"
+flextoolslib.FTM_Help = "FTM_Help"
+
+# Minimal FlexToolsModuleClass
+class FlexToolsModuleClass:
+    def __init__(self, runFunction=None, docs=None, configuration=None):
+        self.runFunction = runFunction
+        self.docs = docs or {}
+        self.configuration = configuration or []
+
+    def Run(self, project, report, modifyAllowed=False):
+        if self.runFunction:
+            self.runFunction(project, report, modifyAllowed)
+
+    def Help(self):
+        return self.docs.get(flextoolslib.FTM_Description, "")
+
+flextoolslib.FlexToolsModuleClass = FlexToolsModuleClass
+
+# Register the mock module
+sys.modules['flextoolslib'] = flextoolslib
+
+# ============================================================
+# Simple Reporter Class (mimics FTReporter interface)
+# ============================================================
+class SimpleReporter:
+    INFO = 0
+    WARNING = 1
+    ERROR = 2
+    BLANK = 3
+    TYPE_NAMES = ["INFO", "WARNING", "ERROR", "BLANK"]
+
+    def __init__(self, max_messages=DEFAULT_MAX_MESSAGES):
+        self.messages = collections.deque(maxlen=max_messages)
+        self.messageCounts = [0, 0, 0, 0]
+        self._append_message = self.messages.append
+
+    def _report(self, msg_type, msg, ref=None):
+        # Plain str is the common case; check it before the slower tests
+        if msg.__class__ is not str and msg is not None and not isinstance(msg, str):
+            msg = repr(msg)
+        self._append_message({
+            "type": self.TYPE_NAMES[msg_type],
+            "message": msg,
+            "ref": ref
+        })
+        self.messageCounts[msg_type] += 1
+
+    def Info(self, msg, ref=None):
+        self._report(self.INFO, msg, ref)
+
+    def Warning(self, msg, ref=None):
+        self._report(self.WARNING, msg, ref)
+
+    def Error(self, msg, ref=None):
+        self._report(self.ERROR, msg, ref)
+
+    def Blank(self):
+        self._report(self.BLANK, "", None)
+
+    def ProgressStart(self, max_val, msg=None):
+        pass  # Progress not captured in non-GUI mode
+
+    def ProgressUpdate(self, value):
+        pass
+
+    def ProgressStop(self):
+        pass
+
+    def FileURL(self, fname):
+        import pathlib
+        return pathlib.Path(os.path.abspath(fname)).as_uri()
+
+
+# ============================================================
+# FLEx session (shared by the runs of a worker)
+# ============================================================
+class FlexSession:
+    """FLEx runtime shared by the runs of a worker.
+
+    Only the initialized runtime is reused. Each run opens the project
+    afresh and closes it afterwards, exactly as a one-shot run does, so it
+    sees changes made in FLEx or by another process since the last run.
+    """
+
+    def __init__(self):
+        self.initialized = False
+        self.project = None
+
+    def initialize(self):
+        if not self.initialized:
+            from flexlibs import FLExInitialize
+            FLExInitialize()
+            self.initialized = True
+
+    def open_project(self, project_name, write_enabled):
+        self.close_project()
+
+        from flexlibs import FLExProject
+        project = FLExProject()
+        project.OpenProject(projectName=project_name, writeEnabled=write_enabled)
+        self.project = project
+        return project
+
+    def close_project(self):
+        project, self.project = self.project, None
+        if project:
+            try:
+                project.CloseProject()
+            except:
+                pass
+
+    def shutdown(self):
+        self.close_project()
+        if self.initialized:
+            self.initialized = False
+            try:
+                from flexlibs import FLExCleanup
+                FLExCleanup()
+            except:
+                pass
+
+
+# ============================================================
+# Main Execution
+# ============================================================
+def run_module(config, session):
+    project_name = config["PROJECT_NAME"]
+    write_enabled = config["WRITE_ENABLED"]
+    module_code = config["MODULE_CODE"]
+
+    result = {
+        "success": False,
+        "project": project_name,
+        "write_enabled": write_enabled,
+        "messages": [],
+        "summary": {},
+        "error": None
+    }
+
+    try:
+        # Initialize FlexLibs
+        session.initialize()
+
+        # Open project
+        try:
+            project = session.open_project(project_name, write_enabled)
+        except Exception as e:
+            result["error"] = "Failed to open project '{}': {}".format(project_name, str(e))
+            return result
+
+        # Create reporter
+        report = SimpleReporter(config.get("MAX_MESSAGES", DEFAULT_MAX_MESSAGES))
+
+        # FLEx uses '***' as placeholder for empty/unset multilingual string values
+        FLEX_EMPTY_PLACEHOLDER = "***"
+
+        def is_empty_multistring(text):
+            """Check if a FLEx multilingual string value is empty.
+
+            FLEx/LCM returns '***' from BestAnalysisAlternative.Text when a
+            multilingual field has no value set, rather than None or empty string.
+            """
+            if text is None:
+                return True
+            if not isinstance(text, str):
+                text = str(text)
+            text = text.strip()
+            return text == "" or text == FLEX_EMPTY_PLACEHOLDER
+
+        # Execute the module code in a namespace
+        module_namespace = {
+            "__name__": "__flextools_module__",
+            "__file__": "module.py",
+            "is_empty_multistring": is_empty_multistring,
+            "FLEX_EMPTY_PLACEHOLDER": FLEX_EMPTY_PLACEHOLDER,
+        }
+
+        # Execute the module code to define Main and FlexToolsModule
+        exec(compile_module(module_code), module_namespace)
+
+        # Find and call Main function
+        if "Main" in module_namespace:
+            module_namespace["Main"](project, report, write_enabled)
+        elif "FlexToolsModule" in module_namespace:
+            module_namespace["FlexToolsModule"].Run(project, report, write_enabled)
+        else:
+            result["error"] = "Module code must define either 'Main' function or 'FlexToolsModule'"
+            return result
+
+        # Collect results
+        result["success"] = True
+        result["messages"] = list(report.messages)
+        result["summary"] = {
+            "info_count": report.messageCounts[SimpleReporter.INFO],
+            "warning_count": report.messageCounts[SimpleReporter.WARNING],
+            "error_count": report.messageCounts[SimpleReporter.ERROR],
+            "total_messages": sum(report.messageCounts)
+        }
+        dropped = sum(report.messageCounts) - len(report.messages)
+        if dropped:
+            result["summary"]["dropped_messages"] = dropped
+
+    except BaseException as e:
+        # SystemExit (a module calling sys.exit()) and the like end this run
+        # only, not a worker serving further runs
+        result["error"] = "Execution error: {}\n{}".format(repr(e) if isinstance(e, SystemExit) else str(e), traceback.format_exc())
+
+    finally:
+        # Close the project (saving write-mode changes) after every run
+        session.close_project()
+
+    return result
+
+
+@contextlib.contextmanager
+def preserved_interpreter_state():
+    """Undo a run's changes to the interpreter state the next worker run sees.
+
+    sys.path, sys.argv, the entries of sys.modules and the globals of the
+    flexlibs modules and the flextoolslib mock are restored afterwards.
+    Modules first imported by the run stay loaded, and other state (class
+    attributes, .NET statics, files, environment) is shared between runs.
+    """
+    saved_path = sys.path[:]
+    saved_argv = sys.argv[:]
+    saved_modules = sys.modules.copy()
+    saved_globals = [
+        (module, vars(module).copy())
+        for name, module in saved_modules.items()
+        if module is not None and (name in ("flexlibs", "flextoolslib") or name.startswith("flexlibs."))
+    ]
+    try:
+        yield
+    finally:
+        sys.path[:] = saved_path
+        sys.argv[:] = saved_argv
+        for name, module in saved_modules.items():
+            if sys.modules.get(name) is not module:
+                sys.modules[name] = module
+        for module, namespace in saved_globals:
+            current = vars(module)
+            current.clear()
+            current.update(namespace)
+
+
+def run_worker():
+    """Serve run configurations from stdin until it is closed."""
+    # Keep the protocol streams to ourselves: anything FLEx or a module
+    # writes to fd 1 goes to stderr instead, and reads of fd 0 see EOF
+    requests = os.fdopen(os.dup(0), "rb")
+    responses = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+    sys.stdin = open(os.devnull, "r")
+    sys.stdout = sys.stderr
+
+    session = FlexSession()
+    try:
+        # Warm up FLEx before the first request arrives; failures surface per run
+        try:
+            session.initialize()
+        except Exception:
+            pass
+
+        while True:
+            header = requests.read(FRAME_HEADER_BYTES)
+            if len(header) < FRAME_HEADER_BYTES:
+                break
+            config = json.loads(requests.read(int.from_bytes(header, "little")))
+
+            # Initialize before taking the snapshot, so a retried
+            # initialization is not undone with the run's changes
+            try:
+                session.initialize()
+            except Exception:
+                pass
+
+            # Module prints are dropped as in a one-shot run; stderr is returned
+            captured_stderr = io.StringIO()
+            with preserved_interpreter_state(), \
+                    contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(captured_stderr):
+                result = run_module(config, session)
+            if captured_stderr.getvalue():
+                result["stderr"] = captured_stderr.getvalue()
+
+            payload = json.dumps(result, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            responses.write(len(payload).to_bytes(FRAME_HEADER_BYTES, "little") + payload)
+            responses.flush()
+    finally:
+        session.shutdown()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--worker"]:
+        run_worker()
+    else:
+        if sys.argv[1] == "-":
+            config = json.loads(sys.stdin.buffer.read())
+        else:
+            with open(sys.argv[1], "r", encoding="utf-8") as config_file:
+                config = json.load(config_file)
+        session = FlexSession()
+        try:
+            result = run_module(config, session)
+        finally:
+            session.shutdown()
+        print(RESULT_MARKER)
+        print(json.dumps(result, separators=(",", ":"), ensure_ascii=False))
@@ -82,6 +82,11 @@ def get_versioned_output_path(base_path: Path, version: str) -> Path:
     return parent / f"{stem}_v{version}.json"
 
 
+def version_key(version: str) -> tuple:
+    """Sort key for X.Y.Z version strings (numeric, not lexicographic)."""
+    return tuple(map(int, version.split('.')))
+
+
 def find_existing_versions(base_dir: Path, prefix: str) -> dict:
     """Find all existing versioned API files for a library.
 
@@ -118,10 +123,9 @@ def run_command(cmd: list, description: str) -> bool:
         if result.returncode == 0:
             print(f"[OK] {description} completed successfully")
             if result.stdout:
-                # Print last few lines of output
+                # Print last few lines of output (as a single write)
                 lines = result.stdout.strip().split('\n')
-                for line in lines[-5:]:
-                    print(f"     {line}")
+                print("\n".join(f"     {line}" for line in lines[-5:]))
             return True
         else:
             print(f"[ERROR] {description} failed")
@@ -261,6 +265,87 @@ def refresh_liblcm(dll_path: str = None) -> bool:
         return False
 
 
+# Namespace-based categorization rules
+NAMESPACE_RULES = {
+    'SIL.LCModel.Core.Text': 'texts',
+    'SIL.LCModel.Core.WritingSystems': 'writing_system',
+    'SIL.LCModel.Core.SpellChecking': 'system',
+    'SIL.LCModel.Core.Scripture': 'scripture',
+    'SIL.LCModel.Core.Phonology': 'grammar',
+    'SIL.LCModel.DomainServices.DataMigration': 'system',
+    'SIL.LCModel.DomainServices.BackupRestore': 'system',
+    'SIL.LCModel.Infrastructure.Impl': 'system',
+    'SIL.LCModel.Infrastructure': 'system',
+    'SIL.LCModel.Utils': 'system',
+    'SIL.LCModel.Tools': 'system',
+}
+
+
+def categorize_entity(name: str, entity: dict) -> str:
+    """Return the semantic category for a LibLCM entity."""
+    current = entity.get('category', 'general')
+    ns = entity.get('namespace', '')
+
+    # Apply namespace rules
+    for ns_pattern, cat in NAMESPACE_RULES.items():
+        if ns.startswith(ns_pattern):
+            return cat
+
+    # Name-based rules
+    name_lower = name.lower()
+
+    # Prefix patterns
+    if name.startswith('IMo') or name.startswith('Mo'):
+        return 'grammar'
+    if name.startswith('IPh') or name.startswith('Ph'):
+        return 'grammar'
+    if name.startswith('IFs') or name.startswith('Fs'):
+        return 'grammar'
+    if name.startswith('IWfi') or name.startswith('Wfi'):
+        return 'wordform'
+    if name.startswith('IDs') or name.startswith('Ds'):
+        return 'discourse'
+    if name.startswith('IRn') or name.startswith('Rn'):
+        return 'notebook'
+    if name.startswith('IScr') or name.startswith('Scr'):
+        return 'scripture'
+    if name.startswith('ISt') or name.startswith('St'):
+        return 'texts'
+    if name.startswith('IText') or name.startswith('Text'):
+        return 'texts'
+    if name.startswith('ILex') or name.startswith('Lex'):
+        return 'lexicon'
+    if name.startswith('IReversal') or name.startswith('Reversal'):
+        return 'reversal'
+
+    # Semantic name patterns
+    if any(x in name_lower for x in ['sense', 'entry', 'lexeme', 'headword']):
+        return 'lexicon'
+    if any(x in name_lower for x in ['paragraph', 'footnote']):
+        return 'texts'
+    if any(x in name_lower for x in ['wordform', 'concordance']):
+        return 'wordform'
+    if any(x in name_lower for x in ['interlin', 'baseline']):
+        return 'texts'
+
+    # Compiler-generated
+    if '<>c__' in name or name.startswith('Class_'):
+        return 'internal'
+
+    # Factory/Repository patterns
+    if 'Factory' in name:
+        return 'factory'
+    if 'Repository' in name:
+        return 'repository'
+
+    return current
+
+
+def categorize_entities(entities: dict) -> list:
+    """Categorize all entities, returning (name, category) pairs."""
+    return [(name, categorize_entity(name, entity)) for name, entity in entities.items()]
+
+
 def apply_categorization() -> bool:
     """Apply semantic categorization to LibLCM entities."""
     print("\n[INFO] Applying semantic categorization to LibLCM...")
@@ -277,8 +362,8 @@ def apply_categorization() -> bool:
             print("[WARN] No LibLCM API files found to categorize")
             return True
 
-        # Get the latest version (sorted lexicographically, which works for semantic versioning)
-        latest_version = sorted(versions.keys())[-1]
+        # Get the latest version (numeric comparison, so 10.0.0 > 9.0.0)
+        latest_version = max(versions, key=version_key)
         liblcm_path = versions[latest_version]
 
         print(f"[INFO] Applying categorization to {liblcm_path.name}")
@@ -286,85 +371,12 @@ def apply_categorization() -> bool:
         with open(liblcm_path, 'r', encoding='utf-8') as f:
             lcm = json.load(f)
 
-        # Namespace-based categorization rules
-        namespace_rules = {
-            'SIL.LCModel.Core.Text': 'texts',
-            'SIL.LCModel.Core.WritingSystems': 'writing_system',
-            'SIL.LCModel.Core.SpellChecking': 'system',
-            'SIL.LCModel.Core.Scripture': 'scripture',
-            'SIL.LCModel.Core.Phonology': 'grammar',
-            'SIL.LCModel.DomainServices.DataMigration': 'system',
-            'SIL.LCModel.DomainServices.BackupRestore': 'system',
-            'SIL.LCModel.Infrastructure.Impl': 'system',
-            'SIL.LCModel.Infrastructure': 'system',
-            'SIL.LCModel.Utils': 'system',
-            'SIL.LCModel.Tools': 'system',
-        }
-
-        def categorize_entity(name, entity):
-            current = entity.get('category', 'general')
-            ns = entity.get('namespace', '')
-
-            # Apply namespace rules
-            for ns_pattern, cat in namespace_rules.items():
-                if ns.startswith(ns_pattern):
-                    return cat
-
-            # Name-based rules
-            name_lower = name.lower()
-
-            # Prefix patterns
-            if name.startswith('IMo') or name.startswith('Mo'):
-                return 'grammar'
-            if name.startswith('IPh') or name.startswith('Ph'):
-                return 'grammar'
-            if name.startswith('IFs') or name.startswith('Fs'):
-                return 'grammar'
-            if name.startswith('IWfi') or name.startswith('Wfi'):
-                return 'wordform'
-            if name.startswith('IDs') or name.startswith('Ds'):
-                return 'discourse'
-            if name.startswith('IRn') or name.startswith('Rn'):
-                return 'notebook'
-            if name.startswith('IScr') or name.startswith('Scr'):
-                return 'scripture'
-            if name.startswith('ISt') or name.startswith('St'):
-                return 'texts'
-            if name.startswith('IText') or name.startswith('Text'):
-                return 'texts'
-            if name.startswith('ILex') or name.startswith('Lex'):
-                return 'lexicon'
-            if name.startswith('IReversal') or name.startswith('Reversal'):
-                return 'reversal'
-
-            # Semantic name patterns
-            if any(x in name_lower for x in ['sense', 'entry', 'lexeme', 'headword']):
-                return 'lexicon'
-            if any(x in name_lower for x in ['paragraph', 'footnote']):
-                return 'texts'
-            if any(x in name_lower for x in ['wordform', 'concordance']):
-                return 'wordform'
-            if any(x in name_lower for x in ['interlin', 'baseline']):
-                return 'texts'
-
-            # Compiler-generated
-            if '<>c__' in name or name.startswith('Class_'):
-                return 'internal'
-
-            # Factory/Repository patterns
-            if 'Factory' in name:
-                return 'factory'
-            if 'Repository' in name:
-                return 'repository'
-
-            return current
-
         # Apply recategorization
+        entities = lcm.get('entities', {})
         changes = 0
-        for name, entity in lcm.get('entities', {}).items():
-            old_cat = entity.get('category', 'general')
-            new_cat = categorize_entity(name, entity)
-            if new_cat != old_cat:
+        for name, new_cat in categorize_entities(entities):
+            entity = entities[name]
+            if new_cat != entity.get('category', 'general'):
                 entity['category'] = new_cat
                 changes += 1
 
@@ -377,10 +389,9 @@ def apply_categorization() -> bool:
         for entity in lcm.get('entities', {}).values():
             categories[entity.get('category', 'NONE')] += 1
 
-        print(f"[OK] Recategorized {changes} entities")
-        print("     Category counts:")
-        for cat, count in categories.most_common(10):
-            print(f"       {cat}: {count}")
+        summary = [f"[OK] Recategorized {changes} entities", "     Category counts:"]
+        summary.extend(f"       {cat}: {count}" for cat, count in categories.most_common(10))
+        print("\n".join(summary))
 
         return True
 
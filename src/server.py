@@ -9,59 +9,185 @@ of the LibLCM and FlexLibs APIs for generating FlexTools scripts.
 
 import json
 import asyncio
+import base64
+import bisect
+import functools
+import heapq
 import sys
 import subprocess
 import tempfile
+import time
+import atexit
+import signal
 import os
 import logging
+import logging.handlers
 import re
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Optional, List, Dict
 from dataclasses import dataclass, field
+from collections import Counter, OrderedDict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 
 from mcp.server import Server
 
 
+# Optional fast JSON parsing and serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Index files at least this large are parsed straight from a memory map
+JSON_MMAP_MIN_BYTES = 50 * 1024 * 1024
+
+
+def load_json_file(path: Path) -> Any:
+    """Parse a JSON index file, using orjson when installed."""
+    if not ORJSON_AVAILABLE:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    if path.stat().st_size < JSON_MMAP_MIN_BYTES:
+        return orjson.loads(path.read_bytes())
+
+    # Large files: parse the mapped pages instead of reading a second copy
+    import mmap
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            return orjson.loads(view)
+
+
+def parse_json(text: str) -> Any:
+    """Parse JSON text, using orjson when installed.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+    catch the stdlib exception either way.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# Tool responses are parsed by MCP clients, so they are sent compact;
+# set FLEXTOOLSMCP_PRETTY_JSON=1 to indent them for debugging.
+PRETTY_JSON = os.environ.get("FLEXTOOLSMCP_PRETTY_JSON", "").lower() in ("1", "true", "yes")
+
+
+def dump_json(data: Any) -> str:
+    """Serialize a tool response as JSON, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if PRETTY_JSON:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, default=str, option=option).decode("utf-8")
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits - let the stdlib encoder handle it
+    if PRETTY_JSON:
+        return json.dumps(data, indent=2, default=str, ensure_ascii=False)
+    return json.dumps(data, separators=(",", ":"), default=str, ensure_ascii=False)
+
+
+def dump_json_bytes(data: Any) -> bytes:
+    """Serialize data as compact UTF-8 JSON bytes for subprocess frames."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits - let the stdlib encoder handle it
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
 # ============================================================
 # Operation Logging System
 # ============================================================
 
-def get_log_dir() -> Path:
-    """Get the log directory path (~/.flextoolsmcp/logs/)."""
+def get_log_dir(create: bool = True) -> Path:
+    """Get the log directory path (~/.flextoolsmcp/logs/), creating it unless create is False."""
     log_dir = Path.home() / ".flextoolsmcp" / "logs"
-    log_dir.mkdir(parents=True, exist_ok=True)
+    if create:
+        log_dir.mkdir(parents=True, exist_ok=True)
     return log_dir
 
 
+class InProcessQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread.
+
+    The stock handler formats each record before enqueueing it so it can be
+    pickled; records here never leave the process, so %-style arguments are
+    merged on the listener thread instead of the caller's. The listener and
+    the handler it writes to are created on the first record, so importing
+    the module does no I/O and starts no thread.
+    """
+
+    def __init__(self, queue, make_handler):
+        super().__init__(queue)
+        self._make_handler = make_handler
+        self._listener = None
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        # Called with the handler lock held, so the listener starts once
+        if self._listener is None:
+            from logging.handlers import QueueListener
+            self._listener = QueueListener(self.queue, self._make_handler())
+            self._listener.start()
+        super().enqueue(record)
+
+    def stop_listener(self):
+        """Write out queued records and stop the listener, if it was started."""
+        with self.lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+
+
+def make_operations_file_handler() -> logging.Handler:
+    """Create the rotating operations.log handler (and the log directory)."""
+    from logging.handlers import RotatingFileHandler
+
+    # File handler with rotation (max 5MB, keep 3 backups)
+    file_handler = RotatingFileHandler(
+        get_log_dir() / "operations.log",
+        maxBytes=5*1024*1024,  # 5MB
+        backupCount=3,
+        encoding='utf-8',
+        delay=True  # Open the log file on the first write
+    )
+    file_handler.setLevel(logging.DEBUG)
+
+    # Format: timestamp | level | message
+    formatter = logging.Formatter(
+        '%(asctime)s | %(levelname)-7s | %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    file_handler.setFormatter(formatter)
+    return file_handler
+
+
 def setup_logging():
     """Configure file logging for operations."""
-    log_dir = get_log_dir()
-    log_file = log_dir / "operations.log"
-
     # Create a logger for operations
     logger = logging.getLogger("flextoolsmcp.operations")
     logger.setLevel(logging.DEBUG)
 
     # Avoid adding duplicate handlers
     if not logger.handlers:
-        # File handler with rotation (max 5MB, keep 3 backups)
-        from logging.handlers import RotatingFileHandler
-        file_handler = RotatingFileHandler(
-            log_file,
-            maxBytes=5*1024*1024,  # 5MB
-            backupCount=3,
-            encoding='utf-8'
-        )
-        file_handler.setLevel(logging.DEBUG)
-
-        # Format: timestamp | level | message
-        formatter = logging.Formatter(
-            '%(asctime)s | %(levelname)-7s | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        # Tool handlers only enqueue records; a background thread does the
+        # file writes and rotation so the event loop never blocks on disk
+        import queue
+        handler = InProcessQueueHandler(queue.SimpleQueue(), make_operations_file_handler)
+        # Registered now, before the pattern tracker's flush, so that exit
+        # handlers which log still run while the listener is up
+        atexit.register(handler.stop_listener)
+        logger.addHandler(handler)
 
     return logger
 
@@ -69,6 +195,27 @@ def setup_logging():
 # Initialize the operations logger
 operations_logger = setup_logging()
 
+# patterns.json is rewritten at most every PATTERN_FLUSH_RECORDS operations or
+# PATTERN_FLUSH_SECONDS, whichever comes first; pending updates flush at exit.
+PATTERN_FLUSH_RECORDS = 32
+PATTERN_FLUSH_SECONDS = 5.0
+# Distinct API calls remembered per error pattern (recommendations show 5)
+MAX_ERROR_PATTERN_API_CALLS = 20
+
+# API-call extraction (PatternTracker.extract_api_calls)
+OPERATIONS_CALL_RE = re.compile(r'(\w+Operations)\s*\(\s*\w+\s*\)\s*\.\s*(\w+)')
+PROJECT_CALL_RE = re.compile(r'project\s*\.\s*(\w+)\s*\(')
+# Attribute access is matched as a whole name and classified in Python, which
+# avoids backtracking over \w* once per alternative
+LCM_ATTRIBUTE_RE = re.compile(r'(?<=\w)\s*\.\s*([A-Z]\w*)')
+LCM_COLLECTION_SUFFIXES = ("OS", "OC", "RS", "RC")
+LCM_TEXT_PREFIXES = ("Gloss", "Definition", "Form")
+
+# Error-message normalization (PatternTracker._normalize_error)
+HEX_ADDRESS_RE = re.compile(r'0x[0-9a-fA-F]+')
+LINE_NUMBER_RE = re.compile(r'line \d+')
+LONG_QUOTED_RE = re.compile(r"'[^']{20,}'")
+
 
 @dataclass
 class PatternTracker:
@@ -78,52 +225,134 @@ class PatternTracker:
 
     def __post_init__(self):
         if self.patterns_file is None:
-            self.patterns_file = get_log_dir() / "patterns.json"
-        self.load()
+            self.patterns_file = get_log_dir(create=False) / "patterns.json"
+        self._dirty = False
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        # get_recommendations() result, cleared whenever patterns change
+        self._recommendations = None
+        # patterns.json is read on first use, not when the module is imported
+        self._loaded = False
+        self._loaded_stamp = None
+        atexit.register(self.flush)
+
+    def _file_stamp(self):
+        """(mtime_ns, size) of patterns.json, or None if it does not exist."""
+        try:
+            st = self.patterns_file.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
 
     def load(self):
-        """Load patterns from disk."""
-        if self.patterns_file.exists():
+        """Load patterns from disk.
+
+        Pending (debounced) updates are saved instead, since the patterns in
+        memory are then newer than the file. Skips the parse when the file is
+        unchanged since this tracker last loaded or saved it.
+        """
+        if self._dirty:
+            self.save()
+            return
+        stamp = self._file_stamp()
+        if self._loaded and stamp is not None and stamp == self._loaded_stamp:
+            return
+        self._loaded = True
+        self._loaded_stamp = stamp
+        self._recommendations = None
+        if stamp is not None:
             try:
-                with open(self.patterns_file, 'r', encoding='utf-8') as f:
-                    self.patterns = json.load(f)
+                self.patterns = load_json_file(self.patterns_file)
             except Exception as e:
-                operations_logger.warning(f"Failed to load patterns: {e}")
+                operations_logger.warning("Failed to load patterns: %s", e)
                 self.patterns = {"api_patterns": {}, "error_patterns": {}}
         else:
             self.patterns = {"api_patterns": {}, "error_patterns": {}}
 
     def save(self):
-        """Save patterns to disk."""
+        """Save patterns to disk.
+
+        Writes to a temp file in the same directory and swaps it in, so a crash
+        mid-write never leaves a truncated patterns.json behind.
+        """
+        self._dirty = False
+        self._pending = 0
+        self._last_flush = time.monotonic()
         try:
-            with open(self.patterns_file, 'w', encoding='utf-8') as f:
-                json.dump(self.patterns, f, indent=2, ensure_ascii=False)
+            # Compact: the file is only read back by this tracker
+            if ORJSON_AVAILABLE:
+                data = orjson.dumps(self.patterns, option=orjson.OPT_NON_STR_KEYS)
+            else:
+                data = json.dumps(self.patterns, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            # mkstemp creates the file 0600; keep the existing file's mode,
+            # or the umask default for a new one
+            try:
+                mode = self.patterns_file.stat().st_mode & 0o777
+            except OSError:
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = 0o666 & ~umask
+            self.patterns_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.patterns_file.parent, prefix=".patterns-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.chmod(tmp_path, mode)
+                os.replace(tmp_path, self.patterns_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._loaded_stamp = self._file_stamp()
         except Exception as e:
-            operations_logger.warning(f"Failed to save patterns: {e}")
+            operations_logger.warning("Failed to save patterns: %s", e)
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def flush(self):
+        """Save patterns if there are unsaved updates."""
+        if self._dirty:
+            self.save()
+
+    def refresh(self):
+        """Reload patterns from disk, or flush them if this process has unsaved updates."""
+        self.load()
+
+    def _maybe_flush(self):
+        """Save once enough updates or time have accumulated since the last write."""
+        self._dirty = True
+        self._pending += 1
+        if (self._pending >= PATTERN_FLUSH_RECORDS
+                or time.monotonic() - self._last_flush >= PATTERN_FLUSH_SECONDS):
+            self.save()
 
     def extract_api_calls(self, code: str) -> List[str]:
         """Extract API method calls from code."""
-        patterns = []
+        patterns = set()  # Deduplicate as we go
         # Match patterns like: ClassName(project).Method() or ops.Method()
-        method_pattern = r'(\w+Operations)\s*\(\s*\w+\s*\)\s*\.\s*(\w+)'
-        for match in re.finditer(method_pattern, code):
-            patterns.append(f"{match.group(1)}.{match.group(2)}")
+        for match in OPERATIONS_CALL_RE.finditer(code):
+            patterns.add(f"{match.group(1)}.{match.group(2)}")
 
         # Match patterns like: project.MethodName()
-        project_pattern = r'project\s*\.\s*(\w+)\s*\('
-        for match in re.finditer(project_pattern, code):
-            patterns.append(f"project.{match.group(1)}")
+        for match in PROJECT_CALL_RE.finditer(code):
+            patterns.add(f"project.{match.group(1)}")
 
         # Match attribute access like: entry.SensesOS, sense.Gloss
-        attr_pattern = r'(\w+)\s*\.\s*((?:[A-Z]\w*OS|[A-Z]\w*OC|[A-Z]\w*RS|[A-Z]\w*RC|Gloss\w*|Definition\w*|Headword|Form\w*))'
-        for match in re.finditer(attr_pattern, code):
-            patterns.append(f"*.{match.group(2)}")
+        for match in LCM_ATTRIBUTE_RE.finditer(code):
+            attr = match.group(1)
+            if ((len(attr) > 2 and attr.endswith(LCM_COLLECTION_SUFFIXES))
+                    or attr.startswith(LCM_TEXT_PREFIXES) or attr == "Headword"):
+                patterns.add(f"*.{attr}")
 
-        return list(set(patterns))  # Deduplicate
+        # Interned, since the same calls recur as api_patterns keys
+        return [sys.intern(p) for p in patterns]
 
     def record_operation(self, code: str, success: bool, error_msg: str = None, error_type: str = None):
         """Record an operation's success or failure for pattern learning."""
+        self._ensure_loaded()
         api_calls = self.extract_api_calls(code)
+        now = datetime.now().isoformat()  # One timestamp for everything this call records
 
         for api_call in api_calls:
             if api_call not in self.patterns["api_patterns"]:
@@ -135,7 +364,7 @@ class PatternTracker:
                 }
 
             pattern_data = self.patterns["api_patterns"][api_call]
-            pattern_data["last_used"] = datetime.now().isoformat()
+            pattern_data["last_used"] = now
 
             if success:
                 pattern_data["success_count"] += 1
@@ -156,7 +385,7 @@ class PatternTracker:
                     "count": 0,
                     "examples": [],
                     "api_calls": [],
-                    "first_seen": datetime.now().isoformat(),
+                    "first_seen": now,
                     "potential_fix": None
                 }
 
@@ -166,29 +395,41 @@ class PatternTracker:
                 err_pattern["examples"].append({
                     "code": code[:500],
                     "error": error_msg[:500],
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": now
                 })
+            affected = err_pattern["api_calls"]
             for api_call in api_calls:
-                if api_call not in err_pattern["api_calls"]:
-                    err_pattern["api_calls"].append(api_call)
+                if len(affected) >= MAX_ERROR_PATTERN_API_CALLS:
+                    break
+                if api_call not in affected:
+                    affected.append(api_call)
 
-        self.save()
+        self._recommendations = None
+        self._maybe_flush()
 
     def _normalize_error(self, error_msg: str) -> str:
         """Normalize error message to group similar errors."""
         # Remove specific values, keep the pattern
         normalized = error_msg
         # Remove hex addresses
-        normalized = re.sub(r'0x[0-9a-fA-F]+', '0x...', normalized)
+        normalized = HEX_ADDRESS_RE.sub('0x...', normalized)
         # Remove line numbers
-        normalized = re.sub(r'line \d+', 'line N', normalized)
+        normalized = LINE_NUMBER_RE.sub('line N', normalized)
         # Remove specific object names in quotes
-        normalized = re.sub(r"'[^']{20,}'", "'...'", normalized)
+        normalized = LONG_QUOTED_RE.sub("'...'", normalized)
         # Take first 100 chars as key
         return normalized[:100]
 
     def get_recommendations(self) -> Dict:
-        """Get pattern-based recommendations for API usage."""
+        """Get pattern-based recommendations for API usage.
+
+        The result is cached until the next record_operation() or load(), and
+        is shared between callers, so treat it as read-only.
+        """
+        self._ensure_loaded()
+        if self._recommendations is not None:
+            return self._recommendations
+
         recommendations = {
             "preferred_patterns": [],
             "patterns_to_avoid": [],
@@ -229,6 +470,7 @@ class PatternTracker:
         recommendations["patterns_to_avoid"].sort(key=lambda x: x["success_rate"])
         recommendations["common_errors_needing_fix"].sort(key=lambda x: -x["count"])
 
+        self._recommendations = recommendations
         return recommendations
 
 
@@ -275,7 +517,7 @@ class SessionState:
         mode_info += f", write={self.write_enabled}"
         if self.test_mode:
             mode_info += " [TEST MODE - read-only enforced]"
-        operations_logger.info(f"Session configured: {mode_info}")
+        operations_logger.info("Session configured: %s", mode_info)
 
     def record_discovered_api(self, entity: str, method: str) -> None:
         """Record an API that was discovered via get_object_api or search_by_capability."""
@@ -796,6 +1038,15 @@ from mcp.types import (
     CallToolResult,
 )
 
+# Threads for query encoding, passed to PyTorch and ONNX Runtime only (not
+# through the environment, which child processes would inherit). Library
+# defaults are often a single thread; FLEXTOOLSMCP_ENCODER_THREADS overrides.
+try:
+    ENCODER_THREADS = int(os.environ.get("FLEXTOOLSMCP_ENCODER_THREADS", "0"))
+except ValueError:
+    ENCODER_THREADS = 0
+ENCODER_THREADS = ENCODER_THREADS if ENCODER_THREADS > 0 else max(1, (os.cpu_count() or 1) - 1)
+
 # Optional imports for semantic search
 try:
     import numpy as np
@@ -805,6 +1056,144 @@ try:
 except ImportError:
     SEMANTIC_SEARCH_AVAILABLE = False
 
+if SEMANTIC_SEARCH_AVAILABLE:
+    import torch
+    torch.set_num_threads(ENCODER_THREADS)
+    try:
+        torch.set_num_interop_threads(2)
+    except RuntimeError:
+        pass  # Inter-op pool already started by the host process
+
+# Optional ONNX Runtime encoder (quantized model exported by build_embeddings.py --onnx)
+try:
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+    ONNX_RUNTIME_AVAILABLE = True
+except ImportError:
+    ONNX_RUNTIME_AVAILABLE = False
+
+
+# Number of distinct query embeddings kept per SemanticSearch instance
+QUERY_EMBEDDING_CACHE_SIZE = 512
+
+# Micro-batching of concurrent query encodes (see QueryBatcher)
+QUERY_BATCH_WINDOW_SECONDS = 0.008
+QUERY_BATCH_MAX_SIZE = 32
+
+
+# Inverted lists probed per query when the persisted index is IVF-partitioned
+FAISS_NPROBE = 16
+# Candidate list size per query when the persisted index is HNSW (raised to k when smaller)
+FAISS_HNSW_EF_SEARCH = 128
+
+# Matches the max_seq_length sentence-transformers uses for MiniLM
+ONNX_MAX_SEQ_LENGTH = 256
+
+
+class OnnxEncoder:
+    """Sentence encoder backed by an ONNX Runtime session.
+
+    Exposes the subset of SentenceTransformer.encode used by SemanticSearch,
+    doing tokenization, the transformer forward pass and mean pooling.
+    """
+
+    def __init__(self, model_dir: Path):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = ENCODER_THREADS
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            str(model_dir / "model.onnx"),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def encode(self, texts: List[str], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **kwargs):
+        """Encode texts into mean-pooled float32 embeddings."""
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=ONNX_MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+            input_ids = tokens["input_ids"].astype(np.int64)
+            feeds = {
+                name: tokens[name].astype(np.int64) if name in tokens else np.zeros_like(input_ids)
+                for name in self.input_names
+            }
+            hidden = self.session.run(None, feeds)[0]
+
+            # Mean pooling over non-padding tokens
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+
+        return np.vstack(batches)
+
+
+class QueryBatcher:
+    """Coalesces concurrently submitted queries into one batched encode call.
+
+    Queries submitted within a short window (or until the batch is full) are
+    encoded together in a worker thread, so concurrent search_by_capability
+    calls share a single transformer forward pass. Batches are encoded one
+    at a time on that single thread, since each encode already uses
+    ENCODER_THREADS.
+    """
+
+    def __init__(self, encode_batch, window: float = QUERY_BATCH_WINDOW_SECONDS,
+                 max_batch: int = QUERY_BATCH_MAX_SIZE):
+        self._encode_batch = encode_batch
+        self._window = window
+        self._max_batch = max_batch
+        self._pending: List[tuple] = []
+        self._timer = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-encoder")
+        # Running batch tasks, referenced until done so they are not collected
+        self._tasks: set = set()
+
+    async def submit(self, query: str):
+        """Queue a query and wait for its embedding row."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, future))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[tuple]) -> None:
+        queries = [query for query, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            embeddings = await loop.run_in_executor(self._executor, self._encode_batch, queries)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for row, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(embeddings[row:row + 1])
+
 
 @dataclass
 class SemanticSearch:
@@ -814,6 +1203,15 @@ class SemanticSearch:
     items: List[Dict] = field(default_factory=list)
     enabled: bool = False
 
+    def __post_init__(self):
+        # Per-instance LRU: repeated queries skip the transformer forward pass
+        self._query_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._batcher: Optional[QueryBatcher] = None
+        # Each item's source as an array (and per-source item counts), built
+        # on first filtered search
+        self._item_sources = None
+        self._source_counts: Counter = Counter()
+
     @classmethod
     def load(cls, index_dir: Path) -> "SemanticSearch":
         """Load semantic search index from disk."""
@@ -832,16 +1230,25 @@ class SemanticSearch:
 
         try:
             # Load metadata
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                metadata = json.load(f)
+            metadata = load_json_file(metadata_path)
             search.items = metadata.get("items", [])
 
             # Load FAISS index
             search.index = faiss.read_index(str(faiss_path))
+            try:
+                faiss.extract_index_ivf(search.index).nprobe = FAISS_NPROBE
+            except RuntimeError:
+                pass  # Flat / PQ index without inverted lists
+            if isinstance(search.index, faiss.IndexHNSW):
+                search.index.hnsw.efSearch = FAISS_HNSW_EF_SEARCH
 
             # Load model (lazy - only when needed)
             model_name = metadata.get("_model", "all-MiniLM-L6-v2")
-            search.model = SentenceTransformer(model_name)
+            onnx_dir = embeddings_dir / "onnx"
+            if ONNX_RUNTIME_AVAILABLE and (onnx_dir / "model.onnx").exists():
+                search.model = OnnxEncoder(onnx_dir)
+            else:
+                search.model = SentenceTransformer(model_name)
 
             search.enabled = True
         except Exception as e:
@@ -849,30 +1256,101 @@ class SemanticSearch:
 
         return search
 
+    def warm_up(self) -> bool:
+        """Run one throwaway encode so the first real query skips lazy init."""
+        if not self.enabled or not self.model:
+            return False
+        try:
+            self._encode_batch(["warmup"])
+            return True
+        except Exception as e:
+            operations_logger.warning("Semantic search warm-up failed: %s", e)
+            return False
+
+    def _cache_get(self, query: str):
+        embedding = self._query_cache.get(query)
+        if embedding is not None:
+            self._query_cache.move_to_end(query)
+        return embedding
+
+    def _cache_put(self, query: str, embedding) -> None:
+        self._query_cache[query] = embedding
+        if len(self._query_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+
+    def _encode_batch(self, queries: List[str]):
+        """Encode queries as normalized, read-only float32 rows (uncached)."""
+        # The encoder normalizes, matching the unit vectors stored in the index
+        embeddings = self.model.encode(queries, batch_size=len(queries), convert_to_numpy=True,
+                                       normalize_embeddings=True)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        # Rows are cached and shared between calls, so guard against mutation
+        embeddings.setflags(write=False)
+        return embeddings
+
+    def _encode(self, query: str):
+        """Encode a single query, consulting the LRU cache first."""
+        embedding = self._cache_get(query)
+        if embedding is None:
+            embedding = self._encode_batch([query])
+            self._cache_put(query, embedding)
+        return embedding
+
+    async def encode_async(self, query: str):
+        """Encode a query, batching with other concurrent callers on a cache miss."""
+        embedding = self._cache_get(query)
+        if embedding is None:
+            if self._batcher is None:
+                self._batcher = QueryBatcher(self._encode_batch)
+            embedding = await self._batcher.submit(query)
+            self._cache_put(query, embedding)
+        return embedding
+
     def search(self, query: str, max_results: int = 10, source_filter: str = "all") -> List[Dict]:
         """Perform semantic search on the query."""
         if not self.enabled or not self.model or not self.index:
             return []
+        return self._search_embedding(self._encode(query), max_results, source_filter)
 
-        # Encode query
-        query_embedding = self.model.encode([query], convert_to_numpy=True)
-        faiss.normalize_L2(query_embedding)
-
-        # Search
-        k = min(max_results * 3, len(self.items))  # Get more results for filtering
-        scores, indices = self.index.search(query_embedding, k)
+    async def search_async(self, query: str, max_results: int = 10, source_filter: str = "all") -> List[Dict]:
+        """Async variant of search() that batches concurrent query encodes."""
+        if not self.enabled or not self.model or not self.index:
+            return []
+        query_embedding = await self.encode_async(query)
+        return self._search_embedding(query_embedding, max_results, source_filter)
+
+    def _search_embedding(self, query_embedding, max_results: int, source_filter: str) -> List[Dict]:
+        """Run the FAISS lookup for an already-encoded query."""
+        total = len(self.items)
+        k = min(max_results * 3, total)  # Get more results for filtering
+        if source_filter != "all":
+            if self._item_sources is None:
+                self._item_sources = np.array([item.get("source") for item in self.items], dtype=object)
+                self._source_counts = Counter(self._item_sources.tolist())
+            source_count = self._source_counts.get(source_filter, 0)
+            if not source_count:
+                return []
+            # Scale the over-fetch by how rare the source is, so small sources
+            # still fill max_results without a retry in the common case
+            k = min(total, -(-k * total // source_count))
+
+        while True:
+            scores, indices = self.index.search(query_embedding, k)
+
+            # Drop padding (-1) hits and other sources with array masks, then
+            # build dicts only for the rows that survive
+            scores, indices = scores[0], indices[0]
+            valid = (indices >= 0) & (indices < total)
+            if source_filter != "all":
+                valid &= self._item_sources[np.where(valid, indices, 0)] == source_filter
+            scores, indices = scores[valid][:max_results], indices[valid][:max_results]
+            if source_filter == "all" or len(indices) >= max_results or k >= total:
+                break
+            k = min(total, k * 2)  # Filter left too few hits: widen and retry
 
         results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < 0 or idx >= len(self.items):
-                continue
-
+        for score, idx in zip(scores.tolist(), indices.tolist()):
             item = self.items[idx]
-
-            # Filter by source
-            if source_filter != "all" and item.get("source") != source_filter:
-                continue
-
             results.append({
                 "score": float(score),
                 "source": item.get("source"),
@@ -884,10 +1362,331 @@ class SemanticSearch:
                 "signature": item.get("signature", ""),
             })
 
-            if len(results) >= max_results:
+        return results
+
+
+@dataclass
+class TokenVocabulary:
+    """Token postings laid out for substring lookup in C.
+
+    Tokens are joined with newlines into one string; since tokens contain no
+    whitespace, every str.find hit lies within a single token, which is then
+    located by bisecting the token start offsets.
+    """
+    text: str = ""
+    starts: List[int] = field(default_factory=list)
+    token_records: List[List[int]] = field(default_factory=list)
+
+    @classmethod
+    def from_postings(cls, postings: Dict[str, List[int]]) -> "TokenVocabulary":
+        vocabulary = cls()
+        offset = 0
+        for token, record_ids in postings.items():
+            vocabulary.starts.append(offset)
+            vocabulary.token_records.append(record_ids)
+            offset += len(token) + 1
+        vocabulary.text = "\n".join(postings)
+        return vocabulary
+
+    def containing(self, term: str) -> set:
+        """Record ids with a token that contains term."""
+        record_ids = set()
+        text, starts = self.text, self.starts
+        position = text.find(term)
+        while position >= 0:
+            token = bisect.bisect_right(starts, position) - 1
+            record_ids.update(self.token_records[token])
+            # Skip to the next token so each token is counted once
+            if token + 1 >= len(starts):
                 break
+            position = text.find(term, starts[token + 1])
+        return record_ids
 
-        return results
+
+@dataclass
+class KeywordIndex:
+    """Inverted index over one API source for keyword capability search.
+
+    Query terms never contain whitespace, so a term occurs in a record's
+    search text iff it is a substring of one of the text's whitespace tokens.
+    Postings are therefore keyed by token, and a term is resolved against the
+    (small) token vocabulary instead of every method and property.
+    Records are numbered in entity order (methods, then properties) so hits
+    come back in the same order as a linear scan. Record data is stored in
+    parallel columns indexed by record id, with per-entity values held once
+    in entity columns.
+    """
+    source_name: str
+    # Entity columns (indexed by entity id)
+    entity_names: List[str] = field(default_factory=list)
+    entity_categories: List[str] = field(default_factory=list)
+    # Record columns (indexed by record id)
+    record_entities: List[int] = field(default_factory=list)
+    record_is_property: List[bool] = field(default_factory=list)
+    record_items: List[dict] = field(default_factory=list)
+    postings: Dict[str, List[int]] = field(default_factory=dict)  # text token -> record ids
+    name_postings: Dict[str, List[int]] = field(default_factory=dict)  # method name token -> record ids
+    exact_names: Dict[str, List[int]] = field(default_factory=dict)  # property/pythonic name -> record ids
+    text_vocabulary: TokenVocabulary = field(default_factory=TokenVocabulary)
+    name_vocabulary: TokenVocabulary = field(default_factory=TokenVocabulary)
+
+    @classmethod
+    def build(cls, source_name: str, index_data: dict) -> "KeywordIndex":
+        """Tokenize every searchable method (and LibLCM property) of a source."""
+        keyword_index = cls(source_name)
+
+        def add_postings(postings: Dict[str, List[int]], text: str, record_id: int) -> None:
+            for token in set(text.split()):
+                postings.setdefault(token, []).append(record_id)
+
+        def add_record(entity_id: int, is_property: bool, item: dict) -> int:
+            keyword_index.record_entities.append(entity_id)
+            keyword_index.record_is_property.append(is_property)
+            keyword_index.record_items.append(item)
+            return len(keyword_index.record_items) - 1
+
+        for entity_name, entity in index_data.get("entities", {}).items():
+            entity_id = len(keyword_index.entity_names)
+            keyword_index.entity_names.append(entity_name)
+            keyword_index.entity_categories.append(entity.get("category", "general"))
+
+            for method in entity.get("methods", []):
+                record_id = add_record(entity_id, False, method)
+                text = "{} {} {}".format(
+                    method.get('name', ''),
+                    method.get('description', ''),
+                    method.get('summary', '')
+                ).lower()
+                add_postings(keyword_index.postings, text, record_id)
+                add_postings(keyword_index.name_postings, method.get('name', '').lower(), record_id)
+
+            # Properties are only searched for LibLCM (pythonic name matching)
+            if source_name == "liblcm":
+                for prop in entity.get("properties", []):
+                    record_id = add_record(entity_id, True, prop)
+                    prop_name = prop.get('name', '')
+                    pythonic_name = prop.get('pythonic_name', prop_name)
+                    text = "{} {} {} {}".format(
+                        prop_name,
+                        pythonic_name,
+                        prop.get('description', ''),
+                        prop.get('kind', '')
+                    ).lower()
+                    add_postings(keyword_index.postings, text, record_id)
+                    for exact in {prop_name.lower(), pythonic_name.lower()}:
+                        keyword_index.exact_names.setdefault(exact, []).append(record_id)
+
+        keyword_index.text_vocabulary = TokenVocabulary.from_postings(keyword_index.postings)
+        keyword_index.name_vocabulary = TokenVocabulary.from_postings(keyword_index.name_postings)
+        return keyword_index
+
+    def search(self, terms, boost: int = 0) -> List[tuple]:
+        """Score records against expanded query terms.
+
+        Each term adds 1 for a text match, 2 more for a method name match and
+        3 for an exact property name match. Records without any match are
+        dropped; the rest are returned as (record_id, score) pairs in record
+        order with boost added. Use hydrate() to build result dicts.
+        """
+        scores: Counter = Counter()
+        for term in terms:
+            scores.update(self.text_vocabulary.containing(term))
+            for record_id in self.name_vocabulary.containing(term):
+                scores[record_id] += 2
+            for record_id in self.exact_names.get(term, ()):
+                scores[record_id] += 3
+
+        return [(record_id, boost + scores[record_id]) for record_id in sorted(scores)]
+
+    def hydrate(self, record_id: int, score: int) -> Dict:
+        """Build the search result dict for a scored record."""
+        entity_id = self.record_entities[record_id]
+        item = self.record_items[record_id]
+        if not self.record_is_property[record_id]:
+            return {
+                "score": score,
+                "source": self.source_name,
+                "entity": self.entity_names[entity_id],
+                "name": item.get("name"),
+                "type": "method",
+                "signature": item.get("signature"),
+                "description": item.get("summary", item.get("description", ""))[:150],
+                "category": self.entity_categories[entity_id],
+            }
+
+        prop_name = item.get('name', '')
+        pythonic_name = item.get('pythonic_name', prop_name)
+        result_item = {
+            "score": score,
+            "source": self.source_name,
+            "entity": self.entity_names[entity_id],
+            "name": prop_name,
+            "pythonic_name": pythonic_name if pythonic_name != prop_name else None,
+            "type": "property",
+            "kind": item.get("kind"),
+            "target_type": item.get("target_type"),
+            "description": item.get("description", "")[:150],
+            "category": self.entity_categories[entity_id],
+        }
+        # Add multistring warning if applicable
+        if item.get("is_multistring"):
+            result_item["is_multistring"] = True
+            result_item["empty_value_warning"] = "Returns '***' when empty - use flexlibs2 wrapper or normalize_text()"
+        return result_item
+
+
+# Relationship and step fields whose values are entity, property or edge-kind names
+NAVIGATION_NAME_FIELDS = frozenset({"target", "via", "from", "to", "type", "kind", "relationship", "cardinality"})
+
+
+def intern_navigation_strings(data: dict) -> dict:
+    """Intern the names repeated throughout a loaded navigation graph, in place.
+
+    JSON parsers share repeated dict keys but give every string value its own
+    object, so each mention of an entity name is otherwise a separate copy.
+    """
+    intern = sys.intern
+
+    def intern_record(record):
+        if not isinstance(record, dict):
+            return record
+        return {
+            intern(k): intern(v) if k in NAVIGATION_NAME_FIELDS and isinstance(v, str) else v
+            for k, v in record.items()
+        }
+
+    if "entities" in data:
+        data["entities"] = {
+            intern(name): {
+                intern(kind): [intern_record(r) for r in rels] if isinstance(rels, list) else rels
+                for kind, rels in relationships.items()
+            }
+            for name, relationships in data["entities"].items()
+        }
+    if "graph" in data:
+        data["graph"] = {
+            intern(source): [[intern(x) if isinstance(x, str) else x for x in edge] for edge in edges]
+            for source, edges in data["graph"].items()
+        }
+    for path in data.get("common_paths", {}).values():
+        if isinstance(path, dict) and isinstance(path.get("steps"), list):
+            path["steps"] = [intern_record(step) for step in path["steps"]]
+    return data
+
+
+# Distinct (from, to) navigation lookups remembered per loaded graph
+NAVIGATION_PATH_CACHE_SIZE = 4096
+
+
+@dataclass
+class NavigationGraph:
+    """Navigation graph in CSR form with integer node ids.
+
+    Edges of node i are edge ids indptr[i]..indptr[i + 1] - 1; the parallel
+    edge lists hold each edge's source and target node ids and its via/type
+    labels. Plain lists are used since BFS only does scalar indexing.
+    """
+    names: List[str] = field(default_factory=list)
+    node_ids: Dict[str, int] = field(default_factory=dict)
+    indptr: List[int] = field(default_factory=lambda: [0])
+    edge_sources: List[int] = field(default_factory=list)
+    edge_targets: List[int] = field(default_factory=list)
+    edge_vias: List[str] = field(default_factory=list)
+    edge_types: List[str] = field(default_factory=list)
+    # Reverse CSR: incoming edge ids of node i are in_edges[in_indptr[i]:in_indptr[i + 1]]
+    in_indptr: List[int] = field(default_factory=lambda: [0])
+    in_edges: List[int] = field(default_factory=list)
+    # Casefolded entity name -> canonical spelling, for case-insensitive lookup
+    name_aliases: Dict[str, str] = field(default_factory=dict)
+    max_name_length: int = 0
+
+    def __post_init__(self):
+        # Per-graph memo of BFS results, discarded with the graph on reload
+        self._path_cache = functools.lru_cache(maxsize=NAVIGATION_PATH_CACHE_SIZE)(
+            lambda start, end: find_path_bfs(self, start, end)
+        )
+        self._code_cache = functools.lru_cache(maxsize=NAVIGATION_PATH_CACHE_SIZE)(
+            lambda start, end: generate_code_from_path(self.find_path(start, end) or [])
+        )
+
+    def canonical_name(self, name: str) -> str:
+        """Map a case-variant entity name to its spelling in the graph."""
+        # Exact names win; anything longer than every known name cannot match
+        if name in self.node_ids or len(name) > self.max_name_length:
+            return name
+        return self.name_aliases.get(name.casefold(), name)
+
+    def find_path(self, start: str, end: str) -> Optional[list]:
+        """Memoized find_path_bfs with the default depth limit."""
+        return self._path_cache(start, end)
+
+    def path_code(self, start: str, end: str) -> str:
+        """Memoized generate_code_from_path for find_path(start, end)."""
+        return self._code_cache(start, end)
+
+    def _node_id(self, name: str) -> int:
+        node_id = self.node_ids.get(name)
+        if node_id is None:
+            node_id = self.node_ids[name] = len(self.names)
+            self.names.append(name)
+        return node_id
+
+    @classmethod
+    def from_graph(cls, graph: dict, entity_names=()) -> "NavigationGraph":
+        """Build from the {source: [[target, via, type], ...]} adjacency dict.
+
+        entity_names adds further known entities (e.g. graph["entities"]) to
+        the case-insensitive alias table.
+        """
+        navigation = cls()
+        for source in graph:
+            navigation._node_id(source)
+
+        # Sources come first, so their edges can be laid out in id order
+        for source_id, source in enumerate(list(navigation.names)):
+            for edge in graph[source]:
+                navigation.edge_sources.append(source_id)
+                navigation.edge_targets.append(navigation._node_id(edge[0]))
+                navigation.edge_vias.append(edge[1])
+                navigation.edge_types.append(edge[2])
+            navigation.indptr.append(len(navigation.edge_targets))
+
+        # Target-only nodes have no outgoing edges
+        navigation.indptr.extend([len(navigation.edge_targets)] * (len(navigation.names) + 1 - len(navigation.indptr)))
+
+        # Incoming edges, grouped by target in edge id order (counting sort)
+        in_counts = [0] * (len(navigation.names) + 1)
+        for target in navigation.edge_targets:
+            in_counts[target + 1] += 1
+        for node_id in range(len(navigation.names)):
+            in_counts[node_id + 1] += in_counts[node_id]
+        navigation.in_indptr = list(in_counts)
+        navigation.in_edges = [0] * len(navigation.edge_targets)
+        for edge_id, target in enumerate(navigation.edge_targets):
+            navigation.in_edges[in_counts[target]] = edge_id
+            in_counts[target] += 1
+
+        for name in [*navigation.names, *entity_names]:
+            navigation.name_aliases.setdefault(name.casefold(), name)
+            navigation.max_name_length = max(navigation.max_name_length, len(name))
+        return navigation
+
+    def edge_step(self, edge_id: int) -> Dict[str, str]:
+        """Decode an edge into a navigation step dict."""
+        return {
+            "from": self.names[self.edge_sources[edge_id]],
+            "to": self.names[self.edge_targets[edge_id]],
+            "via": self.edge_vias[edge_id],
+            "type": self.edge_types[edge_id],
+        }
+
+
+# (attribute, index subdirectory, versioned file prefix, refresh library, label)
+API_SOURCES = (
+    ("liblcm", "liblcm", "liblcm_api", "liblcm", "LibLCM"),
+    ("flexlibs2", "flexlibs", "flexlibs2_api", "flexlibs2", "FlexLibs 2.0"),
+    ("flexlibs_stable", "flexlibs", "flexlibs_api", "flexlibs", "FlexLibs stable"),
+)
 
 
 @dataclass
@@ -897,8 +1696,34 @@ class APIIndex:
     flexlibs2: dict = None
     flexlibs_stable: dict = None
     navigation_graph: dict = None
+    navigation: NavigationGraph = None
     casting_index: dict = None
     semantic_search: SemanticSearch = None
+    keyword_indexes: Dict[str, KeywordIndex] = field(default_factory=dict)
+    # Entity names per source, and their lowercased forms laid out for
+    # substring lookup (token records are positions in entity_names)
+    entity_names: Dict[str, List[str]] = field(default_factory=dict)
+    entity_name_vocabularies: Dict[str, TokenVocabulary] = field(default_factory=dict)
+    # FlexLibs 2.0 methods flattened in entity order as parallel columns
+    # (name_lower, ref), (entity, entity_lower, start, end) row ranges, and
+    # sorted postings of the rows that have an example, overall
+    # ("example_rows") and per operation_type, for find_examples
+    flexlibs2_methods: Dict[str, list] = field(default_factory=dict)
+    # Entity names per source, keyed by lowercased category
+    entities_by_category: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)
+    # Per-category entity counts across FlexLibs 2.0 and LibLCM
+    categories: Dict[str, dict] = field(default_factory=dict)
+    # Lowercased LibLCM pythonic name -> lowercased suffixed full names
+    pythonic_full_names: Dict[str, set] = field(default_factory=dict)
+    # LibLCM suffix_index "by_full_name" entries grouped by property name
+    # (the part after the last "."), in index order, for resolve_property
+    full_names_by_property: Dict[str, List[dict]] = field(default_factory=dict)
+    # Serialized responses that depend only on the loaded indexes
+    response_cache: Dict[str, str] = field(default_factory=dict)
+    # get_object_api results (before session context), LRU-ordered
+    object_api_cache: "OrderedDict[tuple, dict]" = field(default_factory=OrderedDict)
+    # search_by_capability (results, method, sources, fallback) tuples, LRU-ordered
+    capability_cache: "OrderedDict[tuple, tuple]" = field(default_factory=OrderedDict)
 
     @classmethod
     def load(cls, index_dir: Path) -> "APIIndex":
@@ -909,70 +1734,120 @@ class APIIndex:
         """
         index = cls()
 
-        # Load LibLCM (look for versioned files)
-        liblcm_dir = index_dir / "liblcm"
-        liblcm_path = find_latest_versioned_api_file(liblcm_dir, "liblcm_api")
-        if not liblcm_path:
-            operations_logger.info("No LibLCM API file found, attempting auto-refresh...")
-            if auto_refresh_missing_api_file("liblcm", "liblcm_api", liblcm_dir):
-                liblcm_path = find_latest_versioned_api_file(liblcm_dir, "liblcm_api")
-
-        if liblcm_path:
-            try:
-                with open(liblcm_path, "r", encoding="utf-8") as f:
-                    index.liblcm = json.load(f)
-                operations_logger.info(f"Loaded LibLCM from {liblcm_path.name}")
-            except Exception as e:
-                operations_logger.error(f"Failed to load LibLCM: {e}")
-
-        # Load FlexLibs 2.0 (look for versioned files)
-        flexlibs_dir = index_dir / "flexlibs"
-        flexlibs2_path = find_latest_versioned_api_file(flexlibs_dir, "flexlibs2_api")
-        if not flexlibs2_path:
-            operations_logger.info("No FlexLibs 2.0 API file found, attempting auto-refresh...")
-            if auto_refresh_missing_api_file("flexlibs2", "flexlibs2_api", flexlibs_dir):
-                flexlibs2_path = find_latest_versioned_api_file(flexlibs_dir, "flexlibs2_api")
-
-        if flexlibs2_path:
-            try:
-                with open(flexlibs2_path, "r", encoding="utf-8") as f:
-                    index.flexlibs2 = json.load(f)
-                operations_logger.info(f"Loaded FlexLibs 2.0 from {flexlibs2_path.name}")
-            except Exception as e:
-                operations_logger.error(f"Failed to load FlexLibs 2.0: {e}")
-
-        # Load FlexLibs Stable (look for versioned files)
-        flexlibs_stable_path = find_latest_versioned_api_file(flexlibs_dir, "flexlibs_api")
-        if not flexlibs_stable_path:
-            operations_logger.info("No FlexLibs stable API file found, attempting auto-refresh...")
-            if auto_refresh_missing_api_file("flexlibs", "flexlibs_api", flexlibs_dir):
-                flexlibs_stable_path = find_latest_versioned_api_file(flexlibs_dir, "flexlibs_api")
+        # Locate the versioned API files first; auto-refresh writes into these
+        # directories, so it stays sequential
+        api_paths = {}
+        for attr, subdir, prefix, library, label in API_SOURCES:
+            api_path = find_latest_versioned_api_file(index_dir / subdir, prefix)
+            if not api_path:
+                operations_logger.info("No %s API file found, attempting auto-refresh...", label)
+                if auto_refresh_missing_api_file(library, prefix, index_dir / subdir):
+                    api_path = find_latest_versioned_api_file(index_dir / subdir, prefix)
+            if api_path:
+                api_paths[attr] = api_path
+
+        # Parse the index files while the semantic model (mostly native code
+        # that releases the GIL) loads alongside
+        pool = ThreadPoolExecutor(max_workers=len(API_SOURCES) + 3)
+        semantic_future = pool.submit(SemanticSearch.load, index_dir)
+        api_futures = {attr: pool.submit(load_json_file, path) for attr, path in api_paths.items()}
+        nav_graph_path = index_dir / "navigation_graph.json"
+        nav_graph_future = pool.submit(load_json_file, nav_graph_path) if nav_graph_path.exists() else None
+        casting_path = index_dir / "casting_index.json"
+        casting_future = pool.submit(load_json_file, casting_path) if casting_path.exists() else None
+        pool.shutdown(wait=False)
 
-        if flexlibs_stable_path:
+        for attr, subdir, prefix, library, label in API_SOURCES:
+            if attr not in api_futures:
+                continue
             try:
-                with open(flexlibs_stable_path, "r", encoding="utf-8") as f:
-                    index.flexlibs_stable = json.load(f)
-                operations_logger.info(f"Loaded FlexLibs stable from {flexlibs_stable_path.name}")
+                setattr(index, attr, api_futures[attr].result())
+                operations_logger.info("Loaded %s from %s", label, api_paths[attr].name)
             except Exception as e:
-                operations_logger.error(f"Failed to load FlexLibs stable: {e}")
+                operations_logger.error("Failed to load %s: %s", label, e)
 
         # Load navigation graph
-        nav_graph_path = index_dir / "navigation_graph.json"
-        if nav_graph_path.exists():
-            with open(nav_graph_path, "r", encoding="utf-8") as f:
-                index.navigation_graph = json.load(f)
+        if nav_graph_future:
+            index.navigation_graph = intern_navigation_strings(nav_graph_future.result())
+            index.navigation = NavigationGraph.from_graph(
+                index.navigation_graph.get("graph", {}),
+                index.navigation_graph.get("entities", {}),
+            )
 
         # Load casting index (pythonnet interface casting requirements)
-        casting_path = index_dir / "casting_index.json"
-        if casting_path.exists():
-            with open(casting_path, "r", encoding="utf-8") as f:
-                index.casting_index = json.load(f)
+        if casting_future:
+            index.casting_index = casting_future.result()
+
+        # Build keyword search postings for each loaded source
+        for source_name in ("flexlibs2", "flexlibs_stable", "liblcm"):
+            source_data = getattr(index, source_name)
+            if source_data:
+                index.keyword_indexes[source_name] = KeywordIndex.build(source_name, source_data)
+                names = index.entity_names[source_name] = list(source_data.get("entities", {}))
+                name_postings: Dict[str, List[int]] = {}
+                for entity_id, name in enumerate(names):
+                    name_postings.setdefault(name.lower(), []).append(entity_id)
+                index.entity_name_vocabularies[source_name] = TokenVocabulary.from_postings(name_postings)
+                by_category = index.entities_by_category[source_name] = {}
+                for name, entity in source_data.get("entities", {}).items():
+                    category = (entity.get("category", "") or "").lower()
+                    by_category.setdefault(category, []).append(name)
+
+        if index.flexlibs2:
+            columns = index.flexlibs2_methods = {
+                "entities": [], "name_lower": [], "ref": [], "example_rows": [],
+            }
+            for name, entity in index.flexlibs2.get("entities", {}).items():
+                start = len(columns["ref"])
+                for method in entity.get("methods", []):
+                    if method.get("example"):
+                        columns["example_rows"].append(len(columns["ref"]))
+                    columns["name_lower"].append((method.get("name") or "").lower())
+                    columns["ref"].append(method)
+                columns["entities"].append((name, name.lower(), start, len(columns["ref"])))
+            columns["operations"] = {
+                operation: [
+                    row for row in columns["example_rows"]
+                    if any(x in columns["name_lower"][row] for x in keywords)
+                ]
+                for operation, keywords in OPERATION_NAME_KEYWORDS.items()
+            }
+
+        if index.liblcm:
+            by_pythonic = index.liblcm.get("suffix_index", {}).get("by_pythonic_name", {})
+            for pythonic_name, matches in by_pythonic.items():
+                index.pythonic_full_names.setdefault(pythonic_name.lower(), set()).update(
+                    match["full_name"].lower() for match in matches
+                )
+            by_full = index.liblcm.get("suffix_index", {}).get("by_full_name", {})
+            for key, match in by_full.items():
+                index.full_names_by_property.setdefault(key.rpartition(".")[2], []).append(match)
+
+        # Category counts never change for a loaded index
+        if index.flexlibs2:
+            for cat_name, cat_data in index.flexlibs2.get("categories", {}).items():
+                counts = index.categories.setdefault(cat_name, {"flexlibs2_count": 0, "liblcm_count": 0})
+                counts["flexlibs2_count"] = len(cat_data.get("entities", []))
+        if index.liblcm:
+            for entity in index.liblcm.get("entities", {}).values():
+                cat = entity.get("category", "uncategorized")
+                counts = index.categories.setdefault(cat, {"flexlibs2_count": 0, "liblcm_count": 0})
+                counts["liblcm_count"] += 1
 
         # Load semantic search (optional)
-        index.semantic_search = SemanticSearch.load(index_dir)
+        index.semantic_search = semantic_future.result()
 
         return index
 
+    def entities_containing(self, source_name: str, text: str) -> List[str]:
+        """Entity names of a source whose lowercased name contains text, in index order."""
+        vocabulary = self.entity_name_vocabularies.get(source_name)
+        # Names never contain newlines, so a text with one cannot match
+        if vocabulary is None or not vocabulary.starts or "\n" in text:
+            return []
+        names = self.entity_names[source_name]
+        return [names[entity_id] for entity_id in sorted(vocabulary.containing(text))]
+
 
 # Initialize the MCP server
 server = Server("flextools-mcp")
@@ -1029,7 +1904,7 @@ def auto_refresh_missing_api_file(library_name: str, prefix: str, index_dir: Pat
 
         refresh_script = Path(__file__).parent / "refresh.py"
         if not refresh_script.exists():
-            operations_logger.error(f"Refresh script not found: {refresh_script}")
+            operations_logger.error("Refresh script not found: %s", refresh_script)
             return False
 
         import subprocess
@@ -1046,30 +1921,30 @@ def auto_refresh_missing_api_file(library_name: str, prefix: str, index_dir: Pat
         else:
             return False
 
-        operations_logger.info(f"Auto-refreshing {library_name} API index...")
+        operations_logger.info("Auto-refreshing %s API index...", library_name)
         result = subprocess.run(
             cmd,
             cwd=project_root,
             capture_output=True,
             text=True,
-            timeout=300
+            timeout=300,
+            **SUBPROCESS_OPTIONS
         )
 
         if result.returncode == 0:
-            operations_logger.info(f"Successfully refreshed {library_name} API index")
+            operations_logger.info("Successfully refreshed %s API index", library_name)
             return True
         else:
-            operations_logger.warning(f"Failed to refresh {library_name}: {result.stderr[:500]}")
+            operations_logger.warning("Failed to refresh %s: %s", library_name, result.stderr[:500])
             return False
 
     except Exception as e:
-        operations_logger.warning(f"Could not auto-refresh {library_name}: {e}")
+        operations_logger.warning("Could not auto-refresh %s: %s", library_name, e)
         return False
 
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """List available tools."""
+def build_tool_list() -> list[Tool]:
+    """Build the tool definitions advertised by list_tools (see TOOL_LIST)."""
     return [
         Tool(
             name="start",
@@ -1147,7 +2022,7 @@ Use this INSTEAD of jumping directly to run_operation or run_module.""",
                     },
                     "limit": {
                         "type": "integer",
-                        "description": "Maximum number of methods to return (default: 50)",
+                        "description": f"Maximum number of methods to return (default: 50, max: {MAX_METHODS_PER_PAGE})",
                         "default": 50
                     },
                     "offset": {
@@ -1446,6 +2321,12 @@ ALWAYS run with write_enabled=False first (dry-run). Backup before write_enabled
     ]
 
 
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """List available tools."""
+    return list(TOOL_LIST)
+
+
 @server.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
     """Handle tool calls."""
@@ -1454,38 +2335,26 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
     if api_index is None:
         api_index = APIIndex.load(get_index_dir())
 
-    if name == "start":
-        return await handle_start(arguments)
-    elif name == "get_object_api":
-        return await handle_get_object_api(arguments)
-    elif name == "search_by_capability":
-        return await handle_search_by_capability(arguments)
-    elif name == "get_navigation_path":
-        return await handle_get_navigation_path(arguments)
-    elif name == "find_examples":
-        return await handle_find_examples(arguments)
-    elif name == "list_categories":
-        return await handle_list_categories(arguments)
-    elif name == "list_entities_in_category":
-        return await handle_list_entities_in_category(arguments)
-    elif name == "get_module_template":
-        return await handle_get_module_template(arguments)
-    elif name == "start_module":
-        return await handle_start_module(arguments)
-    elif name == "run_module":
-        return await handle_run_module(arguments)
-    elif name == "run_operation":
-        return await handle_run_operation(arguments)
-    elif name == "get_operation_logs":
-        return await handle_get_operation_logs(arguments)
-    elif name == "resolve_property":
-        return await handle_resolve_property(arguments)
-    else:
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
         return [TextContent(type="text", text=f"Unknown tool: {name}")]
+    return await handler(arguments)
+
+
+# Upper bound on methods returned per get_object_api page, whatever limit is requested
+MAX_METHODS_PER_PAGE = 200
+
+# Distinct get_object_api argument combinations whose results are kept
+OBJECT_API_CACHE_SIZE = 512
+
+# Distinct search_by_capability queries whose results are kept
+CAPABILITY_CACHE_SIZE = 512
 
 
 def paginate_entity(entity: dict, summary_only: bool, method_filter: str, limit: int, offset: int) -> dict:
     """Apply pagination and filtering to an entity's methods."""
+    # Oversized pages are clamped; has_more/next_offset tell the client to continue
+    limit = min(limit, MAX_METHODS_PER_PAGE)
     result = {
         "category": entity.get("category"),
         "summary": entity.get("summary", ""),
@@ -1622,7 +2491,7 @@ async def handle_start(args: dict) -> list[TextContent]:
     if warnings:
         result["warnings"] = warnings
 
-    return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
+    return [TextContent(type="text", text=dump_json(result))]
 
 
 def generate_operation_skeleton(task: str, apis: list, mode: str) -> str:
@@ -1780,7 +2649,53 @@ async def handle_get_object_api(args: dict) -> list[TextContent]:
     limit = args.get("limit", 50)
     offset = args.get("offset", 0)
 
+    # The lookup, pagination and ranking depend only on the arguments, the
+    # session mode and the loaded indexes; cached results are shared, so they
+    # are copied before the session context is added
+    cache_key = (object_type, include_flexlibs2, include_liblcm, summary_only,
+                 method_filter, limit, offset, mode)
+    cache = api_index.object_api_cache
+    result = cache.get(cache_key)
+    if result is not None:
+        cache.move_to_end(cache_key)
+    else:
+        result = build_object_api_result(object_type, include_flexlibs2, include_liblcm,
+                                         summary_only, method_filter, limit, offset, mode)
+        cache[cache_key] = result
+        if len(cache) > OBJECT_API_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    if result["found"]:
+        # Record discovered APIs for validation in run_operation
+        if "flexlibs2" in result:
+            entity_name = result["flexlibs2"].get("name", object_type)
+            for method in result["flexlibs2"].get("methods", []):
+                method_name = method.get("name", "")
+                if method_name:
+                    session_state.record_discovered_api(entity_name, method_name)
+        if "liblcm" in result:
+            entity_name = result["liblcm"].get("name", object_type)
+            for prop in result["liblcm"].get("properties", []):
+                prop_name = prop.get("name", "")
+                if prop_name:
+                    session_state.record_discovered_api(entity_name, prop_name)
+            for method in result["liblcm"].get("methods", []):
+                method_name = method.get("name", "")
+                if method_name:
+                    session_state.record_discovered_api(entity_name, method_name)
+
+        # Add session context to response
+        result = build_response_with_context(dict(result), include_session=True)
+
+    return [TextContent(type="text", text=dump_json(result))]
+
+
+def build_object_api_result(object_type: str, include_flexlibs2: bool, include_liblcm: bool,
+                            summary_only: bool, method_filter: str, limit: int, offset: int,
+                            mode: str) -> dict:
+    """Look up, paginate and rank the API documentation for get_object_api."""
     result = {"object_type": object_type, "found": False}
+    object_type_lower = object_type.lower()
 
     # Search in FlexLibs 2.0
     if include_flexlibs2 and api_index.flexlibs2:
@@ -1794,16 +2709,16 @@ async def handle_get_object_api(args: dict) -> list[TextContent]:
             result["found"] = True
         else:
             # Try partial match (e.g., "LexEntry" matches "LexEntryOperations")
-            for name, entity in entities.items():
-                if object_type.lower() in name.lower():
-                    if "flexlibs2_matches" not in result:
-                        result["flexlibs2_matches"] = []
-                    result["flexlibs2_matches"].append({
-                        "name": name,
-                        "category": entity.get("category"),
-                        "methods_count": len(entity.get("methods", []))
-                    })
-                    result["found"] = True
+            for name in api_index.entities_containing("flexlibs2", object_type_lower):
+                entity = entities[name]
+                if "flexlibs2_matches" not in result:
+                    result["flexlibs2_matches"] = []
+                result["flexlibs2_matches"].append({
+                    "name": name,
+                    "category": entity.get("category"),
+                    "methods_count": len(entity.get("methods", []))
+                })
+                result["found"] = True
 
     # Search in LibLCM
     if include_liblcm and api_index.liblcm:
@@ -1815,18 +2730,18 @@ async def handle_get_object_api(args: dict) -> list[TextContent]:
             result["found"] = True
         else:
             # Try partial match
-            for name, entity in entities.items():
-                if object_type.lower() in name.lower():
-                    if "liblcm_matches" not in result:
-                        result["liblcm_matches"] = []
-                    result["liblcm_matches"].append({
-                        "name": name,
-                        "type": entity.get("type"),
-                        "category": entity.get("category")
-                    })
-                    if len(result.get("liblcm_matches", [])) >= 10:
-                        break
-                    result["found"] = True
+            for name in api_index.entities_containing("liblcm", object_type_lower):
+                entity = entities[name]
+                if "liblcm_matches" not in result:
+                    result["liblcm_matches"] = []
+                result["liblcm_matches"].append({
+                    "name": name,
+                    "type": entity.get("type"),
+                    "category": entity.get("category")
+                })
+                if len(result.get("liblcm_matches", [])) >= 10:
+                    break
+                result["found"] = True
 
     if not result["found"]:
         result["message"] = f"No API documentation found for '{object_type}'. Try searching with search_by_capability or list_categories to explore available APIs."
@@ -1878,71 +2793,89 @@ async def handle_get_object_api(args: dict) -> list[TextContent]:
                 match["confidence"] = ranked_match.get("confidence")
                 match["reasoning"] = ranked_match.get("reasoning")
 
-        # Record discovered APIs for validation in run_operation
-        if "flexlibs2" in result:
-            entity_name = result["flexlibs2"].get("name", object_type)
-            for method in result["flexlibs2"].get("methods", []):
-                method_name = method.get("name", "")
-                if method_name:
-                    session_state.record_discovered_api(entity_name, method_name)
-        if "liblcm" in result:
-            entity_name = result["liblcm"].get("name", object_type)
-            for prop in result["liblcm"].get("properties", []):
-                prop_name = prop.get("name", "")
-                if prop_name:
-                    session_state.record_discovered_api(entity_name, prop_name)
-            for method in result["liblcm"].get("methods", []):
-                method_name = method.get("name", "")
-                if method_name:
-                    session_state.record_discovered_api(entity_name, method_name)
-
-        # Add session context to response
-        result = build_response_with_context(result, include_session=True)
-
-    return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
+    return result
 
 
-async def handle_search_by_capability(args: dict) -> list[TextContent]:
-    """Search for methods by capability description with API mode support."""
-    query = args["query"]
-    max_results = args.get("max_results", 10)
-    # Use session mode if not explicitly specified
-    api_mode = args.get("api_mode", session_state.get_mode())
-    use_semantic = args.get("semantic", True)
-
-    # Domain-specific synonyms: map linguistics terms to API terms
-    # Applied BEFORE search to expand the query
-    domain_synonyms = {
-        # Parts of speech -> API terms
-        "noun": "part of speech POS grammatical category",
-        "verb": "part of speech POS grammatical category",
-        "adjective": "part of speech POS grammatical category",
-        "adverb": "part of speech POS grammatical category",
-        "pronoun": "part of speech POS grammatical category",
-        "preposition": "part of speech POS grammatical category",
-        # Common linguistics terms
-        "pos": "part of speech grammatical category",
-        "category": "grammatical category part of speech",
-        "lemma": "headword citation form lexeme entry",
-        "morpheme": "morph allomorph form",
-        "affix": "prefix suffix infix circumfix",
-        "stem": "root base form",
-        "inflection": "inflectional paradigm conjugation declension",
-        "derivation": "derivational affix",
-        # Data terms
-        "translation": "gloss definition meaning",
-        "meaning": "gloss definition sense",
-        "example": "sentence illustration",
-        "pronunciation": "phonetic phonology",
-        "etymology": "origin history borrowed",
-        "domain": "semantic domain category field",
-        "usage": "register style sociolinguistic",
-    }
-
+# Domain-specific synonyms: map linguistics terms to API terms
+# Applied BEFORE search to expand the query
+DOMAIN_SYNONYMS = {
+    # Parts of speech -> API terms
+    "noun": "part of speech POS grammatical category",
+    "verb": "part of speech POS grammatical category",
+    "adjective": "part of speech POS grammatical category",
+    "adverb": "part of speech POS grammatical category",
+    "pronoun": "part of speech POS grammatical category",
+    "preposition": "part of speech POS grammatical category",
+    # Common linguistics terms
+    "pos": "part of speech grammatical category",
+    "category": "grammatical category part of speech",
+    "lemma": "headword citation form lexeme entry",
+    "morpheme": "morph allomorph form",
+    "affix": "prefix suffix infix circumfix",
+    "stem": "root base form",
+    "inflection": "inflectional paradigm conjugation declension",
+    "derivation": "derivational affix",
+    # Data terms
+    "translation": "gloss definition meaning",
+    "meaning": "gloss definition sense",
+    "example": "sentence illustration",
+    "pronunciation": "phonetic phonology",
+    "etymology": "origin history borrowed",
+    "domain": "semantic domain category field",
+    "usage": "register style sociolinguistic",
+}
+
+# Synonym expansion for common operations
+OPERATION_SYNONYMS = {
+    # Operations
+    "add": ["add", "set", "create", "insert", "append"],
+    "set": ["set", "add", "update", "modify", "assign"],
+    "get": ["get", "fetch", "retrieve", "find", "read"],
+    "delete": ["delete", "remove", "clear", "erase"],
+    "remove": ["remove", "delete", "clear"],
+    "create": ["create", "add", "new", "make"],
+    "update": ["update", "set", "modify", "change"],
+    "find": ["find", "search", "get", "lookup", "query"],
+    "list": ["list", "getall", "all", "iterate", "enumerate"],
+    # Lexicon terms
+    "gloss": ["gloss", "translation", "meaning"],
+    "definition": ["definition", "meaning", "description"],
+    "sense": ["sense", "meaning", "definition"],
+    "entry": ["entry", "headword", "lexeme", "word"],
+    # Parts of speech - map to API terms
+    "noun": ["noun", "pos", "partofspeech", "grammatical", "category"],
+    "verb": ["verb", "pos", "partofspeech", "grammatical", "category"],
+    "adjective": ["adjective", "pos", "partofspeech", "grammatical", "category"],
+    "adverb": ["adverb", "pos", "partofspeech", "grammatical", "category"],
+    "pos": ["pos", "partofspeech", "grammatical", "category", "speech"],
+    # Other linguistics terms
+    "lemma": ["lemma", "headword", "citation", "lexeme"],
+    "morpheme": ["morpheme", "morph", "allomorph", "form"],
+    "stem": ["stem", "root", "base"],
+    "affix": ["affix", "prefix", "suffix", "infix"],
+}
+
+@functools.lru_cache(maxsize=4096)
+def expand_query_terms(query_lower: str) -> frozenset:
+    """Split a lowercased query into terms plus their operation synonyms."""
+    query_terms = query_lower.split()
+    expanded_terms = set(query_terms)
+    for term in query_terms:
+        if term in OPERATION_SYNONYMS:
+            expanded_terms.update(OPERATION_SYNONYMS[term])
+    return frozenset(expanded_terms)
+
+
+async def search_capabilities(query: str, max_results: int, api_mode: str, use_semantic: bool,
+                              config: dict) -> tuple:
+    """Run the semantic or keyword search behind search_by_capability.
+
+    Returns (results, search_method, sources_searched, fallback_used).
+    """
     # Expand query with domain synonyms
     query_lower = query.lower()
     expanded_query = query
-    for term, expansion in domain_synonyms.items():
+    for term, expansion in DOMAIN_SYNONYMS.items():
         if term in query_lower:
             expanded_query = f"{query} {expansion}"
             break  # Apply first match only to avoid over-expansion
@@ -1952,39 +2885,12 @@ async def handle_search_by_capability(args: dict) -> list[TextContent]:
     sources_searched = []
     fallback_used = False
 
-    # Define which sources to search based on api_mode
-    # Each mode has primary sources and optional fallback sources
-    mode_config = {
-        "flexlibs2": {
-            "primary": ["flexlibs2"],
-            "fallback": [],  # FlexLibs 2.0 is comprehensive, rarely needs fallback
-            "description": "FlexLibs 2.0 (recommended)"
-        },
-        "flexlibs_stable": {
-            "primary": ["flexlibs_stable"],
-            "fallback": ["liblcm"],  # Fall back to LibLCM for uncovered functionality
-            "description": "FlexLibs Stable with LibLCM fallback"
-        },
-        "liblcm": {
-            "primary": ["liblcm"],
-            "fallback": [],
-            "description": "Pure LibLCM"
-        },
-        "all": {
-            "primary": ["flexlibs2", "flexlibs_stable", "liblcm"],
-            "fallback": [],
-            "description": "All sources"
-        }
-    }
-
-    config = mode_config.get(api_mode, mode_config["all"])
-
     # Try semantic search first if available
     if use_semantic and api_index.semantic_search and api_index.semantic_search.enabled:
         # For semantic search, map api_mode to source filter
         semantic_source = api_mode if api_mode in ["flexlibs2", "liblcm"] else "all"
         # Use expanded query to include domain synonyms
-        semantic_results = api_index.semantic_search.search(expanded_query, max_results, semantic_source)
+        semantic_results = await api_index.semantic_search.search_async(expanded_query, max_results, semantic_source)
         if semantic_results:
             results = semantic_results
             search_method = "semantic"
@@ -1992,131 +2898,25 @@ async def handle_search_by_capability(args: dict) -> list[TextContent]:
 
     # Fall back to keyword search
     if not results:
-        query_lower = query.lower()
-
-        # Synonym expansion for common operations
-        synonyms = {
-            # Operations
-            "add": ["add", "set", "create", "insert", "append"],
-            "set": ["set", "add", "update", "modify", "assign"],
-            "get": ["get", "fetch", "retrieve", "find", "read"],
-            "delete": ["delete", "remove", "clear", "erase"],
-            "remove": ["remove", "delete", "clear"],
-            "create": ["create", "add", "new", "make"],
-            "update": ["update", "set", "modify", "change"],
-            "find": ["find", "search", "get", "lookup", "query"],
-            "list": ["list", "getall", "all", "iterate", "enumerate"],
-            # Lexicon terms
-            "gloss": ["gloss", "translation", "meaning"],
-            "definition": ["definition", "meaning", "description"],
-            "sense": ["sense", "meaning", "definition"],
-            "entry": ["entry", "headword", "lexeme", "word"],
-            # Parts of speech - map to API terms
-            "noun": ["noun", "pos", "partofspeech", "grammatical", "category"],
-            "verb": ["verb", "pos", "partofspeech", "grammatical", "category"],
-            "adjective": ["adjective", "pos", "partofspeech", "grammatical", "category"],
-            "adverb": ["adverb", "pos", "partofspeech", "grammatical", "category"],
-            "pos": ["pos", "partofspeech", "grammatical", "category", "speech"],
-            # Other linguistics terms
-            "lemma": ["lemma", "headword", "citation", "lexeme"],
-            "morpheme": ["morpheme", "morph", "allomorph", "form"],
-            "stem": ["stem", "root", "base"],
-            "affix": ["affix", "prefix", "suffix", "infix"],
-        }
-
         # Expand query terms with synonyms
-        query_terms = query_lower.split()
-        expanded_terms = set(query_terms)
-        for term in query_terms:
-            if term in synonyms:
-                expanded_terms.update(synonyms[term])
+        expanded_terms = set(expand_query_terms(query_lower))
 
         # Expand pythonic names to suffixed equivalents (e.g., "senses" -> "sensesos")
         # This allows searching for "Senses" to find "SensesOS"
-        suffix_index = api_index.liblcm.get("suffix_index", {}) if api_index.liblcm else {}
-        by_pythonic = suffix_index.get("by_pythonic_name", {})
         pythonic_expansions = set()
-        for term in list(expanded_terms):
-            # Check if term matches a pythonic name (case-insensitive)
-            for pythonic_name, matches in by_pythonic.items():
-                if pythonic_name.lower() == term:
-                    # Add all suffixed variants
-                    for match in matches:
-                        pythonic_expansions.add(match["full_name"].lower())
+        for term in expanded_terms:
+            pythonic_expansions.update(api_index.pythonic_full_names.get(term, ()))
         expanded_terms.update(pythonic_expansions)
 
         def search_source(source_name, index_data, boost=0):
-            """Search a single source and return results."""
-            source_results = []
-            if not index_data:
-                return source_results
-
-            for entity_name, entity in index_data.get("entities", {}).items():
-                # Search methods
-                for method in entity.get("methods", []):
-                    score = boost  # Mode-based boost
-                    text_to_search = "{} {} {}".format(
-                        method.get('name', ''),
-                        method.get('description', ''),
-                        method.get('summary', '')
-                    ).lower()
-
-                    for term in expanded_terms:
-                        if term in text_to_search:
-                            score += 1
-                        if term in method.get('name', '').lower():
-                            score += 2
-
-                    if score > boost:  # Only include if actual matches found
-                        source_results.append({
-                            "score": score,
-                            "source": source_name,
-                            "entity": entity_name,
-                            "name": method.get("name"),
-                            "type": "method",
-                            "signature": method.get("signature"),
-                            "description": method.get("summary", method.get("description", ""))[:150],
-                            "category": entity.get("category", "general"),
-                        })
-
-                # Search properties (LibLCM only, for pythonic name matching)
-                if source_name == "liblcm":
-                    for prop in entity.get("properties", []):
-                        score = boost
-                        prop_name = prop.get('name', '')
-                        pythonic_name = prop.get('pythonic_name', prop_name)
-                        text_to_search = "{} {} {} {}".format(
-                            prop_name,
-                            pythonic_name,
-                            prop.get('description', ''),
-                            prop.get('kind', '')
-                        ).lower()
-
-                        for term in expanded_terms:
-                            if term in text_to_search:
-                                score += 1
-                            if term == prop_name.lower() or term == pythonic_name.lower():
-                                score += 3  # Exact property name match gets higher boost
-
-                        if score > boost:
-                            result_item = {
-                                "score": score,
-                                "source": source_name,
-                                "entity": entity_name,
-                                "name": prop_name,
-                                "pythonic_name": pythonic_name if pythonic_name != prop_name else None,
-                                "type": "property",
-                                "kind": prop.get("kind"),
-                                "target_type": prop.get("target_type"),
-                                "description": prop.get("description", "")[:150],
-                                "category": entity.get("category", "general"),
-                            }
-                            # Add multistring warning if applicable
-                            if prop.get("is_multistring"):
-                                result_item["is_multistring"] = True
-                                result_item["empty_value_warning"] = "Returns '***' when empty - use flexlibs2 wrapper or normalize_text()"
-                            source_results.append(result_item)
-            return source_results
+            """Search a single source and return (score, keyword index, record id) hits."""
+            keyword_index = api_index.keyword_indexes.get(source_name)
+            if not index_data or keyword_index is None:
+                return []
+            return [
+                (score, keyword_index, record_id)
+                for record_id, score in keyword_index.search(expanded_terms, boost)
+            ]
 
         # Search primary sources with boost
         for source in config["primary"]:
@@ -2140,9 +2940,62 @@ async def handle_search_by_capability(args: dict) -> list[TextContent]:
                         sources_searched.append("liblcm (fallback)")
                         fallback_used = True
 
-        # Sort by score and limit results
-        results.sort(key=lambda x: x["score"], reverse=True)
-        results = results[:max_results]
+        # Select the top hits (ties keep source/record order) and only
+        # build result dicts for those
+        top_hits = heapq.nsmallest(max_results, enumerate(results), key=lambda hit: (-hit[1][0], hit[0]))
+        results = [keyword_index.hydrate(record_id, score) for _, (score, keyword_index, record_id) in top_hits]
+
+    return results, search_method, sources_searched, fallback_used
+
+
+async def handle_search_by_capability(args: dict) -> list[TextContent]:
+    """Search for methods by capability description with API mode support."""
+    query = args["query"]
+    max_results = args.get("max_results", 10)
+    # Use session mode if not explicitly specified
+    api_mode = args.get("api_mode", session_state.get_mode())
+    use_semantic = args.get("semantic", True)
+
+    # Define which sources to search based on api_mode
+    # Each mode has primary sources and optional fallback sources
+    mode_config = {
+        "flexlibs2": {
+            "primary": ["flexlibs2"],
+            "fallback": [],  # FlexLibs 2.0 is comprehensive, rarely needs fallback
+            "description": "FlexLibs 2.0 (recommended)"
+        },
+        "flexlibs_stable": {
+            "primary": ["flexlibs_stable"],
+            "fallback": ["liblcm"],  # Fall back to LibLCM for uncovered functionality
+            "description": "FlexLibs Stable with LibLCM fallback"
+        },
+        "liblcm": {
+            "primary": ["liblcm"],
+            "fallback": [],
+            "description": "Pure LibLCM"
+        },
+        "all": {
+            "primary": ["flexlibs2", "flexlibs_stable", "liblcm"],
+            "fallback": [],
+            "description": "All sources"
+        }
+    }
+
+    config = mode_config.get(api_mode, mode_config["all"])
+
+    # Results depend only on these arguments and the loaded indexes; whitespace
+    # in the query affects neither the keyword terms nor the encoder tokens
+    cache_key = (" ".join(query.split()), max_results, api_mode, use_semantic)
+    cache = api_index.capability_cache
+    cached = cache.get(cache_key)
+    if cached is not None:
+        cache.move_to_end(cache_key)
+    else:
+        cached = await search_capabilities(query, max_results, api_mode, use_semantic, config)
+        cache[cache_key] = cached
+        if len(cache) > CAPABILITY_CACHE_SIZE:
+            cache.popitem(last=False)
+    results, search_method, sources_searched, fallback_used = cached
 
     # Record discovered APIs for validation in run_operation
     for r in results:
@@ -2166,7 +3019,7 @@ async def handle_search_by_capability(args: dict) -> list[TextContent]:
     # Add session context
     result = build_response_with_context(result, include_session=True)
 
-    return [TextContent(type="text", text=json.dumps(result, indent=2))]
+    return [TextContent(type="text", text=dump_json(result))]
 
 
 def normalize_object_name(name: str) -> str:
@@ -2221,45 +3074,96 @@ def resolve_pythonic_property(name: str, context_entity: str = None) -> List[Dic
                     "kind": match["kind"]
                 }]
         else:
-            # Search all entities for this full name
-            for key, match in by_full.items():
-                if key.endswith(f".{name}"):
-                    results.append({
-                        "entity": match["entity"],
-                        "full_name": name,
-                        "pythonic_name": match["pythonic_name"],
-                        "kind": match["kind"]
-                    })
+            # Search all entities for this full name; names without a dot are
+            # looked up directly instead of scanning every key
+            if "." in name:
+                candidates = [match for key, match in by_full.items() if key.endswith(f".{name}")]
+            else:
+                candidates = api_index.full_names_by_property.get(name, ())
+            for match in candidates:
+                results.append({
+                    "entity": match["entity"],
+                    "full_name": name,
+                    "pythonic_name": match["pythonic_name"],
+                    "kind": match["kind"]
+                })
 
     return results
 
 
-def find_path_bfs(graph: dict, start: str, end: str, max_depth: int = 5) -> list:
-    """Find path between two entities using BFS."""
-    from collections import deque
+def find_path_bfs(navigation: NavigationGraph, start: str, end: str, max_depth: int = 5) -> list:
+    """Find a shortest path between two entities using bidirectional BFS.
 
+    Searches forward from start and backward (over incoming edges) from end,
+    expanding whichever frontier is smaller one full level at a time, and
+    stops at the first node reached from both sides. Paths longer than
+    max_depth steps are not considered.
+    """
     if start == end:
         return []
 
-    queue = deque([(start, [])])
-    visited = {start}
-
-    while queue:
-        current, path = queue.popleft()
-        if len(path) >= max_depth:
-            continue
+    start_id = navigation.node_ids.get(start)
+    end_id = navigation.node_ids.get(end)
+    if start_id is None or end_id is None:
+        return None
 
-        for edge in graph.get(current, []):
-            target, via, rel_type = edge[0], edge[1], edge[2]
+    sources = navigation.edge_sources
+    targets = navigation.edge_targets
+
+    # Node -> edge it was reached by (-1 for the search roots)
+    forward_edge = {start_id: -1}
+    backward_edge = {end_id: -1}
+    forward_frontier = [start_id]
+    backward_frontier = [end_id]
+    depth = 0
+
+    def build_path(meeting: int) -> list:
+        edge_ids = []
+        node = meeting
+        while forward_edge[node] >= 0:
+            edge_ids.append(forward_edge[node])
+            node = sources[forward_edge[node]]
+        edge_ids.reverse()
+        node = meeting
+        while backward_edge[node] >= 0:
+            edge_ids.append(backward_edge[node])
+            node = targets[backward_edge[node]]
+        return [navigation.edge_step(e) for e in edge_ids]
+
+    while forward_frontier and backward_frontier and depth < max_depth:
+        depth += 1
+        next_frontier = []
+        if len(forward_frontier) <= len(backward_frontier):
+            indptr = navigation.indptr
+            for node in forward_frontier:
+                for edge_id in range(indptr[node], indptr[node + 1]):
+                    target = targets[edge_id]
+                    if target in forward_edge:
+                        continue
+                    forward_edge[target] = edge_id
+                    if target in backward_edge:
+                        return build_path(target)
+                    next_frontier.append(target)
+            forward_frontier = next_frontier
+        else:
+            in_indptr, in_edges = navigation.in_indptr, navigation.in_edges
+            for node in backward_frontier:
+                for i in range(in_indptr[node], in_indptr[node + 1]):
+                    edge_id = in_edges[i]
+                    source = sources[edge_id]
+                    if source in backward_edge:
+                        continue
+                    backward_edge[source] = edge_id
+                    if source in forward_edge:
+                        return build_path(source)
+                    next_frontier.append(source)
+            backward_frontier = next_frontier
 
-            if target == end:
-                return path + [{"from": current, "to": target, "via": via, "type": rel_type}]
+    return None
 
-            if target not in visited:
-                visited.add(target)
-                queue.append((target, path + [{"from": current, "to": target, "via": via, "type": rel_type}]))
 
-    return None
+# LibLCM property suffixes for owning/reference sequences and collections
+COLLECTION_SUFFIXES = frozenset({"OS", "OC", "RC", "RS"})
 
 
 def generate_code_from_path(steps: list) -> str:
@@ -2273,17 +3177,14 @@ def generate_code_from_path(steps: list) -> str:
 
     for step in steps:
         prop = step["via"]
-        is_collection = prop.endswith("OS") or prop.endswith("OC") or prop.endswith("RC") or prop.endswith("RS")
+        next_var = step["to"].lower().replace("i", "", 1)
 
-        if is_collection:
-            item_var = step["to"].lower().replace("i", "", 1)
-            lines.append(f"{indent}for {item_var} in {current_var}.{prop}:")
+        if prop[-2:] in COLLECTION_SUFFIXES:
+            lines.append(f"{indent}for {next_var} in {current_var}.{prop}:")
             indent += "    "
-            current_var = item_var
         else:
-            new_var = step["to"].lower().replace("i", "", 1)
-            lines.append(f"{indent}{new_var} = {current_var}.{prop}")
-            current_var = new_var
+            lines.append(f"{indent}{next_var} = {current_var}.{prop}")
+        current_var = next_var
 
     lines.append(f"{indent}# work with {current_var}")
     return "\n".join(lines)
@@ -2296,6 +3197,9 @@ async def handle_get_navigation_path(args: dict) -> list[TextContent]:
 
     from_normalized = normalize_object_name(from_obj)
     to_normalized = normalize_object_name(to_obj)
+    if api_index.navigation:
+        from_normalized = api_index.navigation.canonical_name(from_normalized)
+        to_normalized = api_index.navigation.canonical_name(to_normalized)
 
     result = {
         "from": from_obj,
@@ -2308,11 +3212,10 @@ async def handle_get_navigation_path(args: dict) -> list[TextContent]:
     # Check if navigation graph is loaded
     if not api_index.navigation_graph:
         result["message"] = "Navigation graph not loaded. Run refresh.py to generate it."
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=dump_json(result))]
 
     nav_graph = api_index.navigation_graph
     common_paths = nav_graph.get("common_paths", {})
-    graph = nav_graph.get("graph", {})
 
     # Try precomputed common paths first
     path_key = f"{from_normalized} -> {to_normalized}"
@@ -2323,17 +3226,17 @@ async def handle_get_navigation_path(args: dict) -> list[TextContent]:
         result["steps"] = path_info["steps"]
         result["code"] = path_info.get("code_pattern", "")
         result["description"] = f"Navigate from {from_normalized} to {to_normalized}"
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=dump_json(result))]
 
     # Fall back to BFS pathfinding
-    steps = find_path_bfs(graph, from_normalized, to_normalized)
+    steps = api_index.navigation.find_path(from_normalized, to_normalized)
     if steps:
         result["found"] = True
         result["source"] = "computed"
         result["steps"] = steps
-        result["code"] = generate_code_from_path(steps)
+        result["code"] = api_index.navigation.path_code(from_normalized, to_normalized)
         result["description"] = f"Path found via BFS ({len(steps)} step{'s' if len(steps) != 1 else ''})"
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=dump_json(result))]
 
     # No path found
     result["message"] = f"No navigation path found from {from_normalized} to {to_normalized}."
@@ -2342,11 +3245,22 @@ async def handle_get_navigation_path(args: dict) -> list[TextContent]:
     # Suggest nearby objects if available
     if from_normalized in nav_graph.get("entities", {}):
         entity_rels = nav_graph["entities"][from_normalized]
-        children = [c["target"] for c in entity_rels.get("children", [])[:5]]
+        children = [c["target"] for c in islice(entity_rels.get("children", ()), 5)]
         if children:
             result["reachable_from_source"] = children
 
-    return [TextContent(type="text", text=json.dumps(result, indent=2))]
+    return [TextContent(type="text", text=dump_json(result))]
+
+
+# Method-name keywords that identify each find_examples operation_type
+OPERATION_NAME_KEYWORDS = {
+    "create": ("create", "add", "new"),
+    "read": ("get", "find", "fetch"),
+    "update": ("set", "update", "modify"),
+    "delete": ("delete", "remove"),
+    "iterate": ("getall", "list", "iterate"),
+    "search": ("find", "search", "query"),
+}
 
 
 async def handle_find_examples(args: dict) -> list[TextContent]:
@@ -2357,56 +3271,46 @@ async def handle_find_examples(args: dict) -> list[TextContent]:
     max_results = args.get("max_results", 5)
 
     examples = []
+    object_type_lower = object_type.lower() if object_type else None
+    method_name_lower = method_name.lower() if method_name else None
 
     # Search FlexLibs 2.0 for examples (it has 82% example coverage)
-    if api_index.flexlibs2:
-        for entity_name, entity in api_index.flexlibs2.get("entities", {}).items():
+    methods = api_index.flexlibs2_methods
+    # An unknown operation_type matches no method names
+    op_rows = methods.get("operations", {}).get(operation_type) if operation_type else None
+    if api_index.flexlibs2 and methods and not (operation_type and op_rows is None):
+        names_lower = methods["name_lower"]
+        refs = methods["ref"]
+        # Only rows with an example are ever visited
+        candidate_rows = op_rows if op_rows is not None else methods["example_rows"]
+        for entity_name, entity_name_lower, start, end in methods["entities"]:
             # Filter by object type if specified
-            if object_type and object_type.lower() not in entity_name.lower():
+            if object_type_lower and object_type_lower not in entity_name_lower:
                 continue
 
-            for method in entity.get("methods", []):
-                # Filter by method name if specified
-                if method_name and method_name.lower() not in method.get("name", "").lower():
-                    continue
+            # This entity's rows in the postings
+            rows = candidate_rows[bisect.bisect_left(candidate_rows, start):bisect.bisect_left(candidate_rows, end)]
 
-                # Filter by operation type if specified
-                if operation_type:
-                    name_lower = method.get("name", "").lower()
-                    matches_op = False
-                    if operation_type == "create" and any(x in name_lower for x in ["create", "add", "new"]):
-                        matches_op = True
-                    elif operation_type == "read" and any(x in name_lower for x in ["get", "find", "fetch"]):
-                        matches_op = True
-                    elif operation_type == "update" and any(x in name_lower for x in ["set", "update", "modify"]):
-                        matches_op = True
-                    elif operation_type == "delete" and any(x in name_lower for x in ["delete", "remove"]):
-                        matches_op = True
-                    elif operation_type == "iterate" and any(x in name_lower for x in ["getall", "list", "iterate"]):
-                        matches_op = True
-                    elif operation_type == "search" and any(x in name_lower for x in ["find", "search", "query"]):
-                        matches_op = True
-
-                    if not matches_op:
-                        continue
+            for i in rows:
+                if method_name_lower and method_name_lower not in names_lower[i]:
+                    continue
 
-                # Check if method has an example
-                if method.get("example"):
-                    examples.append({
-                        "class": entity_name,
-                        "method": method.get("name"),
-                        "signature": method.get("signature"),
-                        "description": method.get("summary", method.get("description", ""))[:150],
-                        "example": method.get("example")
-                    })
+                method = refs[i]
+                examples.append({
+                    "class": entity_name,
+                    "method": method.get("name"),
+                    "signature": method.get("signature"),
+                    "description": method.get("summary", method.get("description", ""))[:150],
+                    "example": method.get("example")
+                })
 
-                    if len(examples) >= max_results:
-                        break
+                if len(examples) >= max_results:
+                    break
 
             if len(examples) >= max_results:
                 break
 
-    return [TextContent(type="text", text=json.dumps({
+    return [TextContent(type="text", text=dump_json({
         "query": {
             "method_name": method_name,
             "operation_type": operation_type,
@@ -2414,78 +3318,74 @@ async def handle_find_examples(args: dict) -> list[TextContent]:
         },
         "results_count": len(examples),
         "examples": examples
-    }, indent=2))]
+    }))]
 
 
 async def handle_list_categories(args: dict) -> list[TextContent]:
     """List all available API categories."""
-    categories = {}
-
-    # From FlexLibs 2.0
-    if api_index.flexlibs2:
-        fl2_cats = api_index.flexlibs2.get("categories", {})
-        for cat_name, cat_data in fl2_cats.items():
-            if cat_name not in categories:
-                categories[cat_name] = {"flexlibs2_count": 0, "liblcm_count": 0}
-            categories[cat_name]["flexlibs2_count"] = len(cat_data.get("entities", []))
-
-    # From LibLCM
-    if api_index.liblcm:
-        for entity in api_index.liblcm.get("entities", {}).values():
-            cat = entity.get("category", "uncategorized")
-            if cat not in categories:
-                categories[cat] = {"flexlibs2_count": 0, "liblcm_count": 0}
-            categories[cat]["liblcm_count"] += 1
+    # The listing is a pure function of the loaded indexes
+    cached = api_index.response_cache.get("list_categories")
+    if cached is not None:
+        return [TextContent(type="text", text=cached)]
 
-    return [TextContent(type="text", text=json.dumps({
+    categories = api_index.categories
+    text = dump_json({
         "categories": categories,
         "total_categories": len(categories)
-    }, indent=2))]
+    })
+    api_index.response_cache["list_categories"] = text
+    return [TextContent(type="text", text=text)]
 
 
 async def handle_list_entities_in_category(args: dict) -> list[TextContent]:
     """List all entities in a specific category."""
     category = args["category"].lower()
 
+    cache_key = f"list_entities_in_category:{category}"
+    cached = api_index.response_cache.get(cache_key)
+    if cached is not None:
+        return [TextContent(type="text", text=cached)]
+
     entities = {"flexlibs2": [], "liblcm": []}
 
     # From FlexLibs 2.0
     if api_index.flexlibs2:
-        for entity_name, entity in api_index.flexlibs2.get("entities", {}).items():
-            if entity.get("category", "").lower() == category:
-                entities["flexlibs2"].append({
-                    "name": entity_name,
-                    "methods_count": len(entity.get("methods", [])),
-                    "summary": entity.get("summary", "")[:100]
-                })
+        source_entities = api_index.flexlibs2.get("entities", {})
+        for entity_name in api_index.entities_by_category.get("flexlibs2", {}).get(category, ()):
+            entity = source_entities[entity_name]
+            entities["flexlibs2"].append({
+                "name": entity_name,
+                "methods_count": len(entity.get("methods", [])),
+                "summary": entity.get("summary", "")[:100]
+            })
 
     # From LibLCM
     if api_index.liblcm:
-        for entity_name, entity in api_index.liblcm.get("entities", {}).items():
-            if entity.get("category", "").lower() == category:
-                entities["liblcm"].append({
-                    "name": entity_name,
-                    "type": entity.get("type"),
-                    "summary": entity.get("summary", entity.get("description", ""))[:100]
-                })
+        source_entities = api_index.liblcm.get("entities", {})
+        for entity_name in api_index.entities_by_category.get("liblcm", {}).get(category, ()):
+            entity = source_entities[entity_name]
+            entities["liblcm"].append({
+                "name": entity_name,
+                "type": entity.get("type"),
+                "summary": entity.get("summary", entity.get("description", ""))[:100]
+            })
 
-    return [TextContent(type="text", text=json.dumps({
+    text = dump_json({
         "category": category,
         "entities": entities,
         "counts": {
             "flexlibs2": len(entities["flexlibs2"]),
             "liblcm": len(entities["liblcm"])
         }
-    }, indent=2))]
+    })
+    # Only real categories are cached, which keeps the cache bounded
+    if entities["flexlibs2"] or entities["liblcm"]:
+        api_index.response_cache[cache_key] = text
+    return [TextContent(type="text", text=text)]
 
 
-async def handle_get_module_template(args: dict) -> list[TextContent]:
-    """Return the official FlexTools module template."""
-    module_name = args.get("module_name", "<Module name>")
-    synopsis = args.get("synopsis", "<description>")
-    modifies_db = args.get("modifies_db", False)
-
-    template = '''#
+# Official FlexTools module skeleton, filled in by get_module_template
+MODULE_TEMPLATE = '''#
 #   {module_name}
 #    - A FlexTools Module -
 #
@@ -2536,32 +3436,226 @@ FlexToolsModule = FlexToolsModuleClass(Main, docs)
 #----------------------------------------------------------------
 if __name__ == '__main__':
     print(FlexToolsModule.Help())
-'''.format(
+'''
+
+MODULE_TEMPLATE_NOTES = (
+    "FTM_Version should be an integer (1, 2, 3...), not a string",
+    "Main function must be named 'Main' (not 'MainFunction')",
+    "Use .format() for string formatting (IronPython compatible), not f-strings",
+    "Do not use type hints (IronPython does not support them)",
+    "Do not use pathlib (use os.path instead for IronPython compatibility)",
+    "FlexToolsModule = FlexToolsModuleClass(Main, docs) uses positional args",
+)
+
+MODULE_REPORT_METHODS = (
+    "report.Info(message) - Informational message",
+    "report.Warning(message) - Warning message",
+    "report.Error(message) - Error message",
+    "report.Blank() - Blank line",
+    "report.FileURL(path) - Create clickable file link",
+)
+
+
+@functools.lru_cache(maxsize=128, typed=True)
+def render_module_template(module_name: str, synopsis: str, modifies_db: bool) -> str:
+    """Serialized get_module_template response for the given fields."""
+    template = MODULE_TEMPLATE.format(
         module_name=module_name,
         synopsis=synopsis,
         modifies_db=modifies_db
     )
 
-    result = {
+    return dump_json({
         "template": template,
-        "notes": [
-            "FTM_Version should be an integer (1, 2, 3...), not a string",
-            "Main function must be named 'Main' (not 'MainFunction')",
-            "Use .format() for string formatting (IronPython compatible), not f-strings",
-            "Do not use type hints (IronPython does not support them)",
-            "Do not use pathlib (use os.path instead for IronPython compatibility)",
-            "FlexToolsModule = FlexToolsModuleClass(Main, docs) uses positional args"
+        "notes": list(MODULE_TEMPLATE_NOTES),
+        "report_methods": list(MODULE_REPORT_METHODS),
+    })
+
+
+# Placeholder fields used when get_module_template is called without arguments
+MODULE_TEMPLATE_DEFAULTS = ("<Module name>", "<description>", False)
+# Most calls use the placeholders, so that response is rendered once at import
+DEFAULT_MODULE_TEMPLATE_RESPONSE = render_module_template.__wrapped__(*MODULE_TEMPLATE_DEFAULTS)
+
+
+async def handle_get_module_template(args: dict) -> list[TextContent]:
+    """Return the official FlexTools module template."""
+    default_name, default_synopsis, default_modifies_db = MODULE_TEMPLATE_DEFAULTS
+    module_name = args.get("module_name", default_name)
+    synopsis = args.get("synopsis", default_synopsis)
+    modifies_db = args.get("modifies_db", default_modifies_db)
+
+    if module_name == default_name and synopsis == default_synopsis and modifies_db is False:
+        return [TextContent(type="text", text=DEFAULT_MODULE_TEMPLATE_RESPONSE)]
+
+    try:
+        text = render_module_template(module_name, synopsis, modifies_db)
+    except TypeError:
+        # Unhashable (non-schema) argument values bypass the cache
+        text = render_module_template.__wrapped__(module_name, synopsis, modifies_db)
+
+    return [TextContent(type="text", text=text)]
+
+
+# Questions asked by start_module, in order, until each field is provided
+START_MODULE_QUESTIONS = [
+    {
+        "field": "module_name",
+        "question": "What should the module be named?",
+        "type": "string",
+        "example": "Export Custom Data"
+    },
+    {
+        "field": "synopsis",
+        "question": "Provide a short description of what the module does:",
+        "type": "string",
+        "example": "Exports custom field data to a file"
+    },
+    {
+        "field": "api_target",
+        "question": "Which API should the module target?",
+        "type": "choice",
+        "options": [
+            {
+                "value": "flexlibs2",
+                "label": "FlexLibs 2.0 (Recommended)",
+                "description": "Modern Python wrappers with 99% documentation coverage and examples. Best for new modules. Use api_mode='flexlibs2' in searches."
+            },
+            {
+                "value": "flexlibs_stable",
+                "label": "FlexLibs Stable + LibLCM fallback",
+                "description": "Legacy Python wrappers (~40 functions) with LibLCM fallback for advanced features. Use api_mode='flexlibs_stable' in searches."
+            },
+            {
+                "value": "liblcm",
+                "label": "Pure LibLCM",
+                "description": "Direct C# API access via pythonnet. Maximum flexibility but requires .NET knowledge. Use api_mode='liblcm' in searches."
+            }
         ],
-        "report_methods": [
-            "report.Info(message) - Informational message",
-            "report.Warning(message) - Warning message",
-            "report.Error(message) - Error message",
-            "report.Blank() - Blank line",
-            "report.FileURL(path) - Create clickable file link"
+        "recommended": "flexlibs2"
+    },
+    {
+        "field": "modifies_db",
+        "question": "Will this module modify the FieldWorks database?",
+        "type": "boolean",
+        "hint": "Set to True if the module creates, updates, or deletes entries, senses, or other data."
+    },
+    {
+        "field": "domain",
+        "question": "What is the primary domain this module works with?",
+        "type": "choice",
+        "options": [
+            {"value": "lexicon", "label": "Lexicon", "description": "Entries, senses, definitions, glosses"},
+            {"value": "grammar", "label": "Grammar", "description": "Parts of speech, morphology, inflection"},
+            {"value": "texts", "label": "Texts", "description": "Interlinear texts, discourse analysis"},
+            {"value": "media", "label": "Media", "description": "Pictures, audio files, linked files"},
+            {"value": "general", "label": "General", "description": "Project-wide operations, multiple domains"}
         ]
-    }
+    },
+    {
+        "field": "include_dry_run",
+        "question": "Include a DRY_RUN safety mode? (Recommended for write operations)",
+        "type": "boolean",
+        "hint": "DRY_RUN mode shows what would happen without making changes. Useful for testing.",
+        "recommended": True
+    },
+]
+
+# Asked alongside the required questions, but never required
+START_MODULE_OPTIONAL_QUESTIONS = [
+    {
+        "field": "test_project",
+        "question": "Do you have a FieldWorks test project to verify the script against?",
+        "type": "string",
+        "hint": "Provide the project name (e.g., 'Sena 3') or path. This helps verify the script works before running on production data.",
+        "optional": True,
+        "example": "Sena 3"
+    },
+]
+
+# Module skeleton generated by start_module once every question is answered
+START_MODULE_TEMPLATE = """#
+#   {module_name}
+#    - A FlexTools Module -
+#
+#   {synopsis}
+#
+#   API Target: {api_target}
+#   Platforms: Python .NET and IronPython
+#
+
+{imports}
+{helpers}
+#----------------------------------------------------------------
+# Documentation that the user sees:
+
+docs = {{FTM_Name        : "{module_name}",
+        FTM_Version     : 1,
+        FTM_ModifiesDB  : {modifies_db},
+        FTM_Synopsis    : "{synopsis}",
+        FTM_Description :
+\"\"\"
+{synopsis}
+
+<additional details here>
+\"\"\" }}
+
+#----------------------------------------------------------------
+# The main processing function
+
+def Main(project, report, modifyAllowed):
+    \"\"\"
+    Main entry point for the FlexTools module.
+
+    Args:
+        project: FLExProject instance providing access to the FieldWorks database
+        report: Reporter object for logging (report.Info, report.Warning, report.Error)
+        modifyAllowed: Boolean indicating if database modifications are permitted
+    \"\"\"
+{main_body}
 
-    return [TextContent(type="text", text=json.dumps(result, indent=2))]
+#----------------------------------------------------------------
+
+FlexToolsModule = FlexToolsModuleClass(Main, docs)
+
+#----------------------------------------------------------------
+if __name__ == '__main__':
+    print(FlexToolsModule.Help())
+"""
+
+# API-specific notes and search guidance returned by start_module
+START_MODULE_API_NOTES = {
+    "flexlibs2": {
+        "search_mode": "flexlibs2",
+        "tips": [
+            "Use project.Senses.GetAll() to iterate senses",
+            "Use project.CustomFields.GetValue/SetValue for custom fields",
+            "Use project.Media.* for file operations",
+            "Full documentation at 99% coverage with examples"
+        ],
+        "search_reminder": "Use api_mode='flexlibs2' when calling search_by_capability"
+    },
+    "flexlibs_stable": {
+        "search_mode": "flexlibs_stable",
+        "tips": [
+            "Use project.LexiconAllEntries() to iterate entries",
+            "More limited API (~40 functions)",
+            "LibLCM fallback available for advanced features",
+            "Compatible with older FlexTools installations"
+        ],
+        "search_reminder": "Use api_mode='flexlibs_stable' when calling search_by_capability (includes LibLCM fallback)"
+    },
+    "liblcm": {
+        "search_mode": "liblcm",
+        "tips": [
+            "Direct access to C# LibLCM API via pythonnet",
+            "Requires understanding of .NET and LibLCM architecture",
+            "Most powerful but also most complex",
+            "Use ILexEntry, ILexSense, etc. interface types"
+        ],
+        "search_reminder": "Use api_mode='liblcm' when calling search_by_capability"
+    }
+}
 
 
 async def handle_start_module(args: dict) -> list[TextContent]:
@@ -2580,97 +3674,24 @@ async def handle_start_module(args: dict) -> list[TextContent]:
     # Check what parameters were provided
     provided = {k: v for k, v in args.items() if v is not None}
 
-    # Define required and optional questions
-    required_questions = []
-    optional_questions = []
-
-    if "module_name" not in provided:
-        required_questions.append({
-            "field": "module_name",
-            "question": "What should the module be named?",
-            "type": "string",
-            "example": "Export Custom Data"
-        })
-
-    if "synopsis" not in provided:
-        required_questions.append({
-            "field": "synopsis",
-            "question": "Provide a short description of what the module does:",
-            "type": "string",
-            "example": "Exports custom field data to a file"
-        })
-
-    if "api_target" not in provided:
-        required_questions.append({
-            "field": "api_target",
-            "question": "Which API should the module target?",
-            "type": "choice",
-            "options": [
-                {
-                    "value": "flexlibs2",
-                    "label": "FlexLibs 2.0 (Recommended)",
-                    "description": "Modern Python wrappers with 99% documentation coverage and examples. Best for new modules. Use api_mode='flexlibs2' in searches."
-                },
-                {
-                    "value": "flexlibs_stable",
-                    "label": "FlexLibs Stable + LibLCM fallback",
-                    "description": "Legacy Python wrappers (~40 functions) with LibLCM fallback for advanced features. Use api_mode='flexlibs_stable' in searches."
-                },
-                {
-                    "value": "liblcm",
-                    "label": "Pure LibLCM",
-                    "description": "Direct C# API access via pythonnet. Maximum flexibility but requires .NET knowledge. Use api_mode='liblcm' in searches."
-                }
-            ],
-            "recommended": "flexlibs2"
-        })
-
-    if "modifies_db" not in provided:
-        required_questions.append({
-            "field": "modifies_db",
-            "question": "Will this module modify the FieldWorks database?",
-            "type": "boolean",
-            "hint": "Set to True if the module creates, updates, or deletes entries, senses, or other data."
-        })
-
-    if "domain" not in provided:
-        required_questions.append({
-            "field": "domain",
-            "question": "What is the primary domain this module works with?",
-            "type": "choice",
-            "options": [
-                {"value": "lexicon", "label": "Lexicon", "description": "Entries, senses, definitions, glosses"},
-                {"value": "grammar", "label": "Grammar", "description": "Parts of speech, morphology, inflection"},
-                {"value": "texts", "label": "Texts", "description": "Interlinear texts, discourse analysis"},
-                {"value": "media", "label": "Media", "description": "Pictures, audio files, linked files"},
-                {"value": "general", "label": "General", "description": "Project-wide operations, multiple domains"}
-            ]
-        })
-
-    if args.get("modifies_db") and "include_dry_run" not in provided:
-        required_questions.append({
-            "field": "include_dry_run",
-            "question": "Include a DRY_RUN safety mode? (Recommended for write operations)",
-            "type": "boolean",
-            "hint": "DRY_RUN mode shows what would happen without making changes. Useful for testing.",
-            "recommended": True
-        })
+    # Ask every question whose field is still missing; the DRY_RUN question
+    # only applies to modules that modify the database
+    required_questions = [
+        question for question in START_MODULE_QUESTIONS
+        if question["field"] not in provided
+        and (question["field"] != "include_dry_run" or args.get("modifies_db"))
+    ]
 
     # Optional question - only ask if no required questions remain
-    if "test_project" not in provided:
-        optional_questions.append({
-            "field": "test_project",
-            "question": "Do you have a FieldWorks test project to verify the script against?",
-            "type": "string",
-            "hint": "Provide the project name (e.g., 'Sena 3') or path. This helps verify the script works before running on production data.",
-            "optional": True,
-            "example": "Sena 3"
-        })
+    optional_questions = [
+        question for question in START_MODULE_OPTIONAL_QUESTIONS
+        if question["field"] not in provided
+    ]
 
     # If we have required questions, return them along with optional ones
     if required_questions:
         questions = required_questions + optional_questions
-        return [TextContent(type="text", text=json.dumps({
+        return [TextContent(type="text", text=dump_json({
             "status": "needs_input",
             "environment": env_info,
             "provided": provided,
@@ -2678,7 +3699,7 @@ async def handle_start_module(args: dict) -> list[TextContent]:
             "optional_questions": optional_questions,
             "questions": questions,  # Combined for convenience
             "instructions": "Please ask the user these questions and call start_module again with the answers. Optional questions can be skipped."
-        }, indent=2))]
+        }))]
 
     # All questions answered - generate the template
     module_name = args["module_name"]
@@ -2731,54 +3752,7 @@ DRY_RUN = True  # Set to False to actually make changes
     main_body = "".join(main_body_lines)
 
     # Generate final template
-    template = """#
-#   {module_name}
-#    - A FlexTools Module -
-#
-#   {synopsis}
-#
-#   API Target: {api_target}
-#   Platforms: Python .NET and IronPython
-#
-
-{imports}
-{helpers}
-#----------------------------------------------------------------
-# Documentation that the user sees:
-
-docs = {{FTM_Name        : "{module_name}",
-        FTM_Version     : 1,
-        FTM_ModifiesDB  : {modifies_db},
-        FTM_Synopsis    : "{synopsis}",
-        FTM_Description :
-\"\"\"
-{synopsis}
-
-<additional details here>
-\"\"\" }}
-
-#----------------------------------------------------------------
-# The main processing function
-
-def Main(project, report, modifyAllowed):
-    \"\"\"
-    Main entry point for the FlexTools module.
-
-    Args:
-        project: FLExProject instance providing access to the FieldWorks database
-        report: Reporter object for logging (report.Info, report.Warning, report.Error)
-        modifyAllowed: Boolean indicating if database modifications are permitted
-    \"\"\"
-{main_body}
-
-#----------------------------------------------------------------
-
-FlexToolsModule = FlexToolsModuleClass(Main, docs)
-
-#----------------------------------------------------------------
-if __name__ == '__main__':
-    print(FlexToolsModule.Help())
-""".format(
+    template = START_MODULE_TEMPLATE.format(
         module_name=module_name,
         synopsis=synopsis,
         api_target=api_target,
@@ -2788,40 +3762,6 @@ if __name__ == '__main__':
         main_body=main_body
     )
 
-    # API-specific notes and search guidance
-    api_notes = {
-        "flexlibs2": {
-            "search_mode": "flexlibs2",
-            "tips": [
-                "Use project.Senses.GetAll() to iterate senses",
-                "Use project.CustomFields.GetValue/SetValue for custom fields",
-                "Use project.Media.* for file operations",
-                "Full documentation at 99% coverage with examples"
-            ],
-            "search_reminder": "Use api_mode='flexlibs2' when calling search_by_capability"
-        },
-        "flexlibs_stable": {
-            "search_mode": "flexlibs_stable",
-            "tips": [
-                "Use project.LexiconAllEntries() to iterate entries",
-                "More limited API (~40 functions)",
-                "LibLCM fallback available for advanced features",
-                "Compatible with older FlexTools installations"
-            ],
-            "search_reminder": "Use api_mode='flexlibs_stable' when calling search_by_capability (includes LibLCM fallback)"
-        },
-        "liblcm": {
-            "search_mode": "liblcm",
-            "tips": [
-                "Direct access to C# LibLCM API via pythonnet",
-                "Requires understanding of .NET and LibLCM architecture",
-                "Most powerful but also most complex",
-                "Use ILexEntry, ILexSense, etc. interface types"
-            ],
-            "search_reminder": "Use api_mode='liblcm' when calling search_by_capability"
-        }
-    }
-
     # Build next steps based on configuration
     next_steps = [
         "Save the template to your FlexTools Modules folder",
@@ -2851,9 +3791,9 @@ if __name__ == '__main__':
     if test_project:
         config["test_project"] = test_project
 
-    api_info = api_notes.get(api_target, {})
+    api_info = START_MODULE_API_NOTES.get(api_target, {})
 
-    return [TextContent(type="text", text=json.dumps({
+    return [TextContent(type="text", text=dump_json({
         "status": "complete",
         "environment": env_info,
         "configuration": config,
@@ -2866,352 +3806,201 @@ if __name__ == '__main__':
         },
         "next_steps": next_steps,
         "testing_reminder": "Always test FlexTools modules on a backup or sample project first!" if not test_project else None
-    }, indent=2))]
-
-
-async def handle_run_module(args: dict) -> list[TextContent]:
-    """Execute a FlexTools module against a FieldWorks project using FlexLibs directly."""
-    module_code = args["module_code"]
-    # Use session state as fallback for project and write settings
-    project_name = args.get("project_name", session_state.get_project())
-    write_enabled = args.get("write_enabled", session_state.is_write_enabled())
-
-    # Test mode enforces read-only
-    if session_state.is_test_mode():
-        write_enabled = False
-
-    # Validate project_name is available
-    if not project_name:
-        return [TextContent(type="text", text=json.dumps({
-            "error": "project_name required",
-            "message": "No project specified. Either set project_name in start() or provide it directly.",
-            "session": session_state.summary()
-        }, indent=2))]
-
-    # Check for CUD operations requiring confirmation
-    confirmed = args.get("confirmed", False)
-    cud_info = detect_cud_operations(module_code)
-
-    if cud_info["is_cud"] and not confirmed:
-        return [TextContent(type="text", text=json.dumps(
-            format_cud_warning(cud_info, write_enabled), indent=2
-        ))]
+    }))]
 
-    timeout_seconds = args.get("timeout_seconds", 300)
-
-    # Build warnings
-    warnings = []
-    if write_enabled:
-        warnings.extend([
-            "*** WRITE MODE ENABLED ***",
-            "Changes WILL be made to the database!",
-            "Make sure you have a backup of your project!",
-            ""
-        ])
-    else:
-        warnings.extend([
-            "Running in READ-ONLY mode (dry-run)",
-            "No changes will be made to the database.",
-            "Set write_enabled=True to enable modifications.",
-            ""
-        ])
-
-    # Create the runner script that will be executed in a subprocess
-    runner_script = '''# -*- coding: utf-8 -*-
-"""FlexTools Module Runner - Generated by FlexToolsMCP"""
-import sys
-import json
-import os
-import traceback
-
-# ============================================================
-# Mock flextoolslib module (so module code can import from it)
-# ============================================================
-import types
-
-# Create fake flextoolslib module
-flextoolslib = types.ModuleType('flextoolslib')
-
-# FlexTools module documentation keys
-flextoolslib.FTM_Name = "FTM_Name"
-flextoolslib.FTM_Version = "FTM_Version"
-flextoolslib.FTM_ModifiesDB = "FTM_ModifiesDB"
-flextoolslib.FTM_Synopsis = "FTM_Synopsis"
-flextoolslib.FTM_Description = "FTM_Description"
-flextoolslib.FTM_Help = "FTM_Help"
-
-# Minimal FlexToolsModuleClass
-class FlexToolsModuleClass:
-    def __init__(self, runFunction=None, docs=None, configuration=None):
-        self.runFunction = runFunction
-        self.docs = docs or {}
-        self.configuration = configuration or []
-
-    def Run(self, project, report, modifyAllowed=False):
-        if self.runFunction:
-            self.runFunction(project, report, modifyAllowed)
-
-    def Help(self):
-        return self.docs.get(flextoolslib.FTM_Description, "")
-
-flextoolslib.FlexToolsModuleClass = FlexToolsModuleClass
-
-# Register the mock module
-sys.modules['flextoolslib'] = flextoolslib
-
-# ============================================================
-# Simple Reporter Class (mimics FTReporter interface)
-# ============================================================
-class SimpleReporter:
-    INFO = 0
-    WARNING = 1
-    ERROR = 2
-    BLANK = 3
-    TYPE_NAMES = ["INFO", "WARNING", "ERROR", "BLANK"]
-
-    def __init__(self):
-        self.messages = []
-        self.messageCounts = [0, 0, 0, 0]
-
-    def _report(self, msg_type, msg, ref=None):
-        if msg is not None and not isinstance(msg, str):
-            msg = repr(msg)
-        self.messages.append({
-            "type": self.TYPE_NAMES[msg_type],
-            "message": msg,
-            "ref": ref
-        })
-        self.messageCounts[msg_type] += 1
-
-    def Info(self, msg, ref=None):
-        self._report(self.INFO, msg, ref)
-
-    def Warning(self, msg, ref=None):
-        self._report(self.WARNING, msg, ref)
-
-    def Error(self, msg, ref=None):
-        self._report(self.ERROR, msg, ref)
-
-    def Blank(self):
-        self._report(self.BLANK, "", None)
-
-    def ProgressStart(self, max_val, msg=None):
-        pass  # Progress not captured in non-GUI mode
-
-    def ProgressUpdate(self, value):
-        pass
-
-    def ProgressStop(self):
-        pass
-
-    def FileURL(self, fname):
-        import pathlib
-        return pathlib.Path(os.path.abspath(fname)).as_uri()
-
-
-# ============================================================
-# Main Execution
-# ============================================================
-def run_module():
-    result = {
-        "success": False,
-        "project": PROJECT_NAME,
-        "write_enabled": WRITE_ENABLED,
-        "messages": [],
-        "summary": {},
-        "error": None
-    }
-
-    project = None
 
-    try:
-        # Initialize FlexLibs
-        from flexlibs import FLExInitialize, FLExCleanup, FLExProject
+# Launch options for every child process. On POSIX, close_fds=False lets
+# CPython use posix_spawn instead of fork+exec; descriptors the server opens
+# are non-inheritable (PEP 446). On Windows, close_fds=False would pass every
+# inheritable handle from the server's parent (the MCP stdio pipes included)
+# to each child, so it stays True there, and no console window is opened.
+if sys.platform == "win32":
+    SUBPROCESS_OPTIONS = {"close_fds": True, "creationflags": subprocess.CREATE_NO_WINDOW}
+else:
+    SUBPROCESS_OPTIONS = {"close_fds": False}
 
-        FLExInitialize()
+# Subprocess entry point that opens the project and runs module code
+MODULE_RUNNER_PATH = Path(__file__).parent / "module_runner.py"
 
-        # Open project
-        project = FLExProject()
-        try:
-            project.OpenProject(projectName=PROJECT_NAME, writeEnabled=WRITE_ENABLED)
-        except Exception as e:
-            result["error"] = "Failed to open project '{}': {}".format(PROJECT_NAME, str(e))
-            return result
+# Most recent report messages kept by the subprocess runners; older ones are
+# counted but dropped so chatty modules cannot grow the result without bound
+try:
+    MAX_REPORT_MESSAGES = int(os.environ.get("FLEXTOOLSMCP_MAX_REPORT_MESSAGES", "10000"))
+except ValueError:
+    MAX_REPORT_MESSAGES = 0
+MAX_REPORT_MESSAGES = MAX_REPORT_MESSAGES if MAX_REPORT_MESSAGES > 0 else 10000
 
-        # Create reporter
-        report = SimpleReporter()
-
-        # FLEx uses '***' as placeholder for empty/unset multilingual string values
-        FLEX_EMPTY_PLACEHOLDER = "***"
-
-        def is_empty_multistring(text):
-            """Check if a FLEx multilingual string value is empty.
-
-            FLEx/LCM returns '***' from BestAnalysisAlternative.Text when a
-            multilingual field has no value set, rather than None or empty string.
-            """
-            if text is None:
-                return True
-            if not isinstance(text, str):
-                text = str(text)
-            text = text.strip()
-            return text == "" or text == FLEX_EMPTY_PLACEHOLDER
-
-        # Execute the module code in a namespace
-        module_namespace = {
-            "__name__": "__flextools_module__",
-            "__file__": "module.py",
-            "is_empty_multistring": is_empty_multistring,
-            "FLEX_EMPTY_PLACEHOLDER": FLEX_EMPTY_PLACEHOLDER,
-        }
+# FLEXTOOLSMCP_MODULE_WORKER=1 makes run_module reuse one worker process,
+# started on the first run, so Python and FLEx initialize only once. By
+# default every call spawns a fresh runner.
+MODULE_WORKER_ENABLED = os.environ.get("FLEXTOOLSMCP_MODULE_WORKER", "0").lower() in ("1", "true", "yes")
+# Worker frames: 4-byte little-endian length, then that many bytes of JSON
+MODULE_FRAME_HEADER_BYTES = 4
 
-        # Execute the module code to define Main and FlexToolsModule
-        exec(MODULE_CODE, module_namespace)
 
-        # Find and call Main function
-        if "Main" in module_namespace:
-            module_namespace["Main"](project, report, WRITE_ENABLED)
-        elif "FlexToolsModule" in module_namespace:
-            module_namespace["FlexToolsModule"].Run(project, report, WRITE_ENABLED)
-        else:
-            result["error"] = "Module code must define either 'Main' function or 'FlexToolsModule'"
-            return result
+class ModuleWorker:
+    """A long-lived `module_runner.py --worker` process, one run at a time.
 
-        # Collect results
-        result["success"] = True
-        result["messages"] = report.messages
-        result["summary"] = {
-            "info_count": report.messageCounts[SimpleReporter.INFO],
-            "warning_count": report.messageCounts[SimpleReporter.WARNING],
-            "error_count": report.messageCounts[SimpleReporter.ERROR],
-            "total_messages": len(report.messages)
-        }
+    The worker is (re)started on demand, so a crash or a timed-out run only
+    costs the next call a fresh start. Output that reaches the worker's fd 2
+    (native FLEx output, for instance) goes to the operations log.
+    """
 
-    except Exception as e:
-        result["error"] = "Execution error: {}\\n{}".format(str(e), traceback.format_exc())
+    def __init__(self):
+        self._process = None
+        self._stderr_task = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        if self._process is None or self._process.returncode is not None:
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable, "-u", str(MODULE_RUNNER_PATH), "--worker",
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                **SUBPROCESS_OPTIONS,
+            )
+            self._stderr_task = asyncio.create_task(self._log_stderr(self._process))
 
-    finally:
-        # Clean up
-        if project:
-            try:
-                project.CloseProject()
-            except:
-                pass
-        try:
-            FLExCleanup()
-        except:
-            pass
+    @staticmethod
+    async def _log_stderr(process) -> None:
+        async for line in process.stderr:
+            operations_logger.info("Module worker %s: %s", process.pid, line.decode("utf-8", "replace").rstrip())
 
-    return result
+    def stop(self) -> None:
+        process, self._process = self._process, None
+        if process is not None and process.returncode is None:
+            process.kill()
 
+    async def run(self, config: dict, timeout: float) -> dict:
+        """Send one run configuration and wait for its result.
 
-if __name__ == "__main__":
-    result = run_module()
-    print("===FLEXTOOLS_RESULT_JSON===")
-    print(json.dumps(result, indent=2, ensure_ascii=False))
-'''
+        Raises asyncio.TimeoutError (after killing the worker) if the run
+        takes longer than timeout seconds.
+        """
+        async with self._lock:
+            await self.start()
+            process = self._process
+            try:
+                payload = dump_json_bytes(config)
+                process.stdin.write(len(payload).to_bytes(MODULE_FRAME_HEADER_BYTES, "little") + payload)
+                await process.stdin.drain()
+                return await asyncio.wait_for(self._read_result(process), timeout)
+            except BaseException:
+                self.stop()
+                raise
+
+    @staticmethod
+    async def _read_result(process) -> dict:
+        try:
+            header = await process.stdout.readexactly(MODULE_FRAME_HEADER_BYTES)
+            return parse_json(await process.stdout.readexactly(int.from_bytes(header, "little")))
+        except asyncio.IncompleteReadError:
+            returncode = await process.wait()
+            raise RuntimeError("Module worker exited unexpectedly (exit code {})".format(returncode)) from None
 
-    # Escape the module code for embedding in the script
-    # We use repr() to safely escape all special characters
-    escaped_module_code = repr(module_code)
-
-    # Create the complete script with configuration
-    full_script = '''# Configuration
-PROJECT_NAME = {project_name}
-WRITE_ENABLED = {write_enabled}
-MODULE_CODE = {module_code}
-
-{runner_script}
-'''.format(
-        project_name=repr(project_name),
-        write_enabled=repr(write_enabled),
-        module_code=escaped_module_code,
-        runner_script=runner_script
-    )
 
-    # Write to temporary file
-    try:
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as f:
-            f.write(full_script)
-            temp_script_path = f.name
-    except Exception as e:
-        return [TextContent(type="text", text=json.dumps({
-            "success": False,
-            "error": "Failed to create temporary script: {}".format(str(e)),
-            "warnings": warnings
-        }, indent=2))]
+module_worker = ModuleWorker()
 
-    try:
-        # Run the script in a subprocess
-        # Use the same Python interpreter
-        # stdin=DEVNULL prevents hanging if FLEx prompts for input
-        result = subprocess.run(
-            [sys.executable, temp_script_path],
-            capture_output=True,
-            text=True,
-            timeout=timeout_seconds,
-            encoding='utf-8',
-            stdin=subprocess.DEVNULL
-        )
+# Runner result marker in one-shot runner output, and how much of the output
+# before it (and of stderr) is kept for error reports
+RUNNER_RESULT_MARKER = b"===FLEXTOOLS_RESULT_JSON==="
+RUNNER_OUTPUT_TAIL_BYTES = 1024 * 1024
+RUNNER_READ_CHUNK_BYTES = 64 * 1024
 
-        stdout = result.stdout
-        stderr = result.stderr
 
-        # Parse the JSON result from stdout
-        if "===FLEXTOOLS_RESULT_JSON===" in stdout:
-            json_start = stdout.index("===FLEXTOOLS_RESULT_JSON===") + len("===FLEXTOOLS_RESULT_JSON===")
-            json_str = stdout[json_start:].strip()
-            try:
-                execution_result = json.loads(json_str)
-            except json.JSONDecodeError as e:
-                execution_result = {
-                    "success": False,
-                    "error": "Failed to parse result JSON: {}".format(str(e)),
-                    "raw_output": stdout
-                }
-        else:
-            execution_result = {
-                "success": False,
-                "error": "No result marker found in output",
-                "raw_output": stdout,
-                "stderr": stderr
-            }
+@dataclass
+class RunnerOutput:
+    """Output of a one-shot runner script, split at the result marker."""
+    returncode: int
+    stdout: str                 # output before the marker (its tail if very long)
+    result_json: Optional[str]  # everything after the marker, None if absent
+    stderr: str                 # tail of stderr
 
-        # Add warnings, metadata, and optionally the full module code for learning
-        execution_result["warnings"] = warnings
-        execution_result["exit_code"] = result.returncode
-        if stderr and not execution_result.get("error"):
-            execution_result["stderr"] = stderr
-        if args.get("show_code", True):
-            execution_result["module_code"] = module_code
 
-        return [TextContent(type="text", text=json.dumps(execution_result, indent=2, ensure_ascii=False))]
+async def _read_until_marker(stream) -> tuple:
+    """Read stream chunks until the result marker, keeping a bounded tail.
 
-    except subprocess.TimeoutExpired:
-        return [TextContent(type="text", text=json.dumps({
-            "success": False,
-            "error": "Execution timed out after {} seconds".format(timeout_seconds),
-            "warnings": warnings
-        }, indent=2))]
+    Returns (bytes before the marker, bytes after it or None at EOF).
+    """
+    buffer = bytearray()
+    while True:
+        chunk = await stream.read(RUNNER_READ_CHUNK_BYTES)
+        if not chunk:
+            return bytes(buffer), None
+        # Rescan only where a marker split across chunks could start
+        scan_from = max(0, len(buffer) - len(RUNNER_RESULT_MARKER) + 1)
+        buffer += chunk
+        marker_at = buffer.find(RUNNER_RESULT_MARKER, scan_from)
+        if marker_at >= 0:
+            rest = bytes(buffer[marker_at + len(RUNNER_RESULT_MARKER):]) + await stream.read()
+            return bytes(buffer[:marker_at]), rest
+        if len(buffer) > RUNNER_OUTPUT_TAIL_BYTES:
+            del buffer[:len(buffer) - RUNNER_OUTPUT_TAIL_BYTES]
+
+
+async def _read_tail(stream) -> bytes:
+    """Drain a stream, keeping only its last RUNNER_OUTPUT_TAIL_BYTES."""
+    buffer = bytearray()
+    while True:
+        chunk = await stream.read(RUNNER_READ_CHUNK_BYTES)
+        if not chunk:
+            return bytes(buffer)
+        buffer += chunk
+        if len(buffer) > RUNNER_OUTPUT_TAIL_BYTES:
+            del buffer[:len(buffer) - RUNNER_OUTPUT_TAIL_BYTES]
+
+
+async def run_runner_script(command: list, timeout: float, input_data: Optional[bytes] = None,
+                            env: Optional[dict] = None) -> RunnerOutput:
+    """Run a one-shot runner script without blocking the event loop.
+
+    stdout and stderr are consumed as they arrive, so memory stays bounded
+    however much a module prints. Raises subprocess.TimeoutExpired (after
+    killing the process) like subprocess.run.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=subprocess.PIPE if input_data is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+        **SUBPROCESS_OPTIONS,
+    )
 
-    except Exception as e:
-        return [TextContent(type="text", text=json.dumps({
-            "success": False,
-            "error": "Subprocess execution error: {}".format(str(e)),
-            "warnings": warnings
-        }, indent=2))]
+    async def communicate():
+        if input_data is not None:
+            process.stdin.write(input_data)
+            await process.stdin.drain()
+            process.stdin.close()
+        (before, after), stderr = await asyncio.gather(
+            _read_until_marker(process.stdout), _read_tail(process.stderr)
+        )
+        await process.wait()
+        return before, after, stderr
 
-    finally:
-        # Clean up temporary file
-        try:
-            os.unlink(temp_script_path)
-        except:
-            pass
+    try:
+        before, after, stderr = await asyncio.wait_for(communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise subprocess.TimeoutExpired(command, timeout) from None
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+        raise
+
+    return RunnerOutput(
+        returncode=process.returncode,
+        stdout=before.decode("utf-8", errors="replace"),
+        result_json=after.decode("utf-8", errors="replace") if after is not None else None,
+        stderr=stderr.decode("utf-8", errors="replace"),
+    )
 
 
-async def handle_run_operation(args: dict) -> list[TextContent]:
-    """Execute FlexLibs2 operations directly without module boilerplate."""
-    operations = args["operations"]
+async def handle_run_module(args: dict) -> list[TextContent]:
+    """Execute a FlexTools module against a FieldWorks project using FlexLibs directly."""
+    module_code = args["module_code"]
     # Use session state as fallback for project and write settings
     project_name = args.get("project_name", session_state.get_project())
     write_enabled = args.get("write_enabled", session_state.is_write_enabled())
@@ -3222,42 +4011,20 @@ async def handle_run_operation(args: dict) -> list[TextContent]:
 
     # Validate project_name is available
     if not project_name:
-        return [TextContent(type="text", text=json.dumps({
+        return [TextContent(type="text", text=dump_json({
             "error": "project_name required",
             "message": "No project specified. Either set project_name in start() or provide it directly.",
             "session": session_state.summary()
-        }, indent=2))]
-
-    # Check if API discovery was performed
-    skip_api_check = args.get("skip_api_check", False)
-    if not skip_api_check and len(session_state.get_discovered_apis()) == 0:
-        return [TextContent(type="text", text=json.dumps({
-            "error": "API discovery required",
-            "message": "No APIs have been discovered yet. Before running operations, you MUST use one of these tools first:\n"
-                      "1. start(task='...') - discovers relevant APIs automatically\n"
-                      "2. get_object_api(object_type='...') - get API for specific object\n"
-                      "3. search_by_capability(query='...') - search for APIs by description\n\n"
-                      "This prevents using incorrect/hallucinated method names.",
-            "hint": "Call start() or search_by_capability() first, then use the discovered methods in your code.",
-            "session": session_state.summary()
-        }, indent=2))]
+        }))]
 
     # Check for CUD operations requiring confirmation
     confirmed = args.get("confirmed", False)
-    cud_info = detect_cud_operations(operations)
+    cud_info = detect_cud_operations(module_code)
 
     if cud_info["is_cud"] and not confirmed:
-        return [TextContent(type="text", text=json.dumps(
-            format_cud_warning(cud_info, write_enabled), indent=2
-        ))]
-
-    timeout_seconds = args.get("timeout_seconds", 120)
+        return [TextContent(type="text", text=dump_json(format_cud_warning(cud_info, write_enabled)))]
 
-    # Log operation start
-    operations_logger.info(f"=== Operation Start ===")
-    operations_logger.info(f"Project: {project_name}")
-    operations_logger.info(f"Write enabled: {write_enabled}")
-    operations_logger.debug(f"Code:\n{operations}")
+    timeout_seconds = args.get("timeout_seconds", 300)
 
     # Build warnings
     warnings = []
@@ -3265,22 +4032,113 @@ async def handle_run_operation(args: dict) -> list[TextContent]:
         warnings.extend([
             "*** WRITE MODE ENABLED ***",
             "Changes WILL be made to the database!",
+            "Make sure you have a backup of your project!",
             ""
         ])
     else:
         warnings.extend([
             "Running in READ-ONLY mode (dry-run)",
             "No changes will be made to the database.",
+            "Set write_enabled=True to enable modifications.",
             ""
         ])
 
-    # Create the runner script with all flexlibs2 imports
-    runner_script = '''# -*- coding: utf-8 -*-
+    run_config = {
+        "PROJECT_NAME": project_name,
+        "WRITE_ENABLED": write_enabled,
+        "MODULE_CODE": module_code,
+        "MAX_MESSAGES": MAX_REPORT_MESSAGES,
+    }
+
+    if MODULE_WORKER_ENABLED:
+        try:
+            execution_result = await module_worker.run(run_config, timeout_seconds)
+        except asyncio.TimeoutError:
+            return [TextContent(type="text", text=dump_json({
+                "success": False,
+                "error": "Execution timed out after {} seconds".format(timeout_seconds),
+                "warnings": warnings
+            }))]
+        except Exception as e:
+            return [TextContent(type="text", text=dump_json({
+                "success": False,
+                "error": "Subprocess execution error: {}".format(str(e)),
+                "warnings": warnings
+            }))]
+
+        # Add warnings, metadata, and optionally the full module code for learning
+        stderr = execution_result.pop("stderr", "")
+        execution_result["warnings"] = warnings
+        if stderr and not execution_result.get("error"):
+            execution_result["stderr"] = stderr
+        if args.get("show_code", True):
+            execution_result["module_code"] = module_code
+
+        return [TextContent(type="text", text=dump_json(execution_result))]
+
+    try:
+        # Run the shipped runner script in a subprocess with the same Python
+        # interpreter; its configuration arrives on stdin, whose EOF also
+        # prevents hanging if FLEx prompts for input
+        output = await run_runner_script(
+            [sys.executable, str(MODULE_RUNNER_PATH), "-"],
+            timeout_seconds,
+            input_data=dump_json_bytes(run_config),
+        )
+        stderr = output.stderr
+
+        # Parse the JSON result that follows the marker
+        if output.result_json is not None:
+            try:
+                execution_result = parse_json(output.result_json.strip())
+            except json.JSONDecodeError as e:
+                execution_result = {
+                    "success": False,
+                    "error": "Failed to parse result JSON: {}".format(str(e)),
+                    "raw_output": output.stdout + RUNNER_RESULT_MARKER.decode() + output.result_json
+                }
+        else:
+            execution_result = {
+                "success": False,
+                "error": "No result marker found in output",
+                "raw_output": output.stdout,
+                "stderr": stderr
+            }
+
+        # Add warnings, metadata, and optionally the full module code for learning
+        execution_result["warnings"] = warnings
+        execution_result["exit_code"] = output.returncode
+        if stderr and not execution_result.get("error"):
+            execution_result["stderr"] = stderr
+        if args.get("show_code", True):
+            execution_result["module_code"] = module_code
+
+        return [TextContent(type="text", text=dump_json(execution_result))]
+
+    except subprocess.TimeoutExpired:
+        return [TextContent(type="text", text=dump_json({
+            "success": False,
+            "error": "Execution timed out after {} seconds".format(timeout_seconds),
+            "warnings": warnings
+        }))]
+
+    except Exception as e:
+        return [TextContent(type="text", text=dump_json({
+            "success": False,
+            "error": "Subprocess execution error: {}".format(str(e)),
+            "warnings": warnings
+        }))]
+
+
+# run_operation runner script, split around its per-run configuration block
+OPERATION_RUNNER_HEAD = '''# -*- coding: utf-8 -*-
 """FlexLibs2 Operation Runner - Generated by FlexToolsMCP"""
 import sys
+import base64
 import json
 import traceback
 import io
+import collections
 
 # Force UTF-8 stdout on Windows to handle Unicode characters properly
 if sys.platform == 'win32':
@@ -3336,10 +4194,9 @@ def is_empty_multistring(text):
     return text == "" or text == FLEX_EMPTY_PLACEHOLDER
 
 # Configuration
-PROJECT_NAME = {project_name}
-WRITE_ENABLED = {write_enabled}
-OPERATIONS = {operations}
+'''
 
+OPERATION_RUNNER_TAIL = '''
 # ============================================================
 # Simple Reporter Class
 # ============================================================
@@ -3351,17 +4208,19 @@ class SimpleReporter:
     TYPE_NAMES = ["INFO", "WARNING", "ERROR", "BLANK"]
 
     def __init__(self):
-        self.messages = []
+        self.messages = collections.deque(maxlen=MAX_MESSAGES)
         self.messageCounts = [0, 0, 0, 0]
+        self._append_message = self.messages.append
 
     def _report(self, msg_type, msg, ref=None):
-        if msg is not None and not isinstance(msg, str):
+        # Plain str is the common case; check it before the slower tests
+        if msg.__class__ is not str and msg is not None and not isinstance(msg, str):
             msg = repr(msg)
-        self.messages.append({{
+        self._append_message({
             "type": self.TYPE_NAMES[msg_type],
             "message": msg,
             "ref": ref
-        }})
+        })
         self.messageCounts[msg_type] += 1
 
     def Info(self, msg, ref=None):
@@ -3381,14 +4240,14 @@ class SimpleReporter:
 # Main Execution
 # ============================================================
 def run_operation():
-    result = {{
+    result = {
         "success": False,
         "project": PROJECT_NAME,
         "write_enabled": WRITE_ENABLED,
         "messages": [],
-        "summary": {{}},
+        "summary": {},
         "error": None
-    }}
+    }
 
     project = None
     report = SimpleReporter()
@@ -3435,14 +4294,14 @@ def run_operation():
         try:
             project.OpenProject(projectName=PROJECT_NAME, writeEnabled=WRITE_ENABLED)
         except Exception as e:
-            result["error"] = "Failed to open project '{{}}': {{}}".format(PROJECT_NAME, str(e))
+            result["error"] = "Failed to open project '{}': {}".format(PROJECT_NAME, str(e))
             return result
 
         # Make variables available to the operations code
         write_enabled = WRITE_ENABLED
 
         # Execute the operations
-        exec(OPERATIONS, {{
+        exec(OPERATIONS, {
             "project": project,
             "report": report,
             "write_enabled": write_enabled,
@@ -3503,21 +4362,24 @@ def run_operation():
             "AnnotationDefOperations": AnnotationDefOperations,
             "CheckOperations": CheckOperations,
             "CustomFieldOperations": CustomFieldOperations,
-        }})
+        })
 
         # Collect results
         result["success"] = True
-        result["messages"] = report.messages
-        result["summary"] = {{
+        result["messages"] = list(report.messages)
+        result["summary"] = {
             "info_count": report.messageCounts[SimpleReporter.INFO],
             "warning_count": report.messageCounts[SimpleReporter.WARNING],
             "error_count": report.messageCounts[SimpleReporter.ERROR],
-            "total_messages": len(report.messages)
-        }}
+            "total_messages": sum(report.messageCounts)
+        }
+        dropped = sum(report.messageCounts) - len(report.messages)
+        if dropped:
+            result["summary"]["dropped_messages"] = dropped
 
     except Exception as e:
-        result["error"] = "Execution error: {{}}\\n{{}}".format(str(e), traceback.format_exc())
-        result["messages"] = report.messages
+        result["error"] = "Execution error: {}\\n{}".format(str(e), traceback.format_exc())
+        result["messages"] = list(report.messages)
 
     finally:
         # Clean up
@@ -3537,12 +4399,85 @@ def run_operation():
 if __name__ == "__main__":
     result = run_operation()
     print("===FLEXTOOLS_RESULT_JSON===")
-    print(json.dumps(result, indent=2, ensure_ascii=False))
-'''.format(
-        project_name=repr(project_name),
-        write_enabled=repr(write_enabled),
-        operations=repr(operations)
-    )
+    print(json.dumps(result, separators=(",", ":"), ensure_ascii=False))
+'''
+
+
+async def handle_run_operation(args: dict) -> list[TextContent]:
+    """Execute FlexLibs2 operations directly without module boilerplate."""
+    operations = args["operations"]
+    # Use session state as fallback for project and write settings
+    project_name = args.get("project_name", session_state.get_project())
+    write_enabled = args.get("write_enabled", session_state.is_write_enabled())
+
+    # Test mode enforces read-only
+    if session_state.is_test_mode():
+        write_enabled = False
+
+    # Validate project_name is available
+    if not project_name:
+        return [TextContent(type="text", text=dump_json({
+            "error": "project_name required",
+            "message": "No project specified. Either set project_name in start() or provide it directly.",
+            "session": session_state.summary()
+        }))]
+
+    # Check if API discovery was performed
+    skip_api_check = args.get("skip_api_check", False)
+    if not skip_api_check and len(session_state.get_discovered_apis()) == 0:
+        return [TextContent(type="text", text=dump_json({
+            "error": "API discovery required",
+            "message": "No APIs have been discovered yet. Before running operations, you MUST use one of these tools first:\n"
+                      "1. start(task='...') - discovers relevant APIs automatically\n"
+                      "2. get_object_api(object_type='...') - get API for specific object\n"
+                      "3. search_by_capability(query='...') - search for APIs by description\n\n"
+                      "This prevents using incorrect/hallucinated method names.",
+            "hint": "Call start() or search_by_capability() first, then use the discovered methods in your code.",
+            "session": session_state.summary()
+        }))]
+
+    # Check for CUD operations requiring confirmation
+    confirmed = args.get("confirmed", False)
+    cud_info = detect_cud_operations(operations)
+
+    if cud_info["is_cud"] and not confirmed:
+        return [TextContent(type="text", text=dump_json(format_cud_warning(cud_info, write_enabled)))]
+
+    timeout_seconds = args.get("timeout_seconds", 120)
+
+    # Log operation start
+    operations_logger.info("=== Operation Start ===")
+    operations_logger.info("Project: %s", project_name)
+    operations_logger.info("Write enabled: %s", write_enabled)
+    operations_logger.debug("Code:\n%s", operations)
+
+    # Build warnings
+    warnings = []
+    if write_enabled:
+        warnings.extend([
+            "*** WRITE MODE ENABLED ***",
+            "Changes WILL be made to the database!",
+            ""
+        ])
+    else:
+        warnings.extend([
+            "Running in READ-ONLY mode (dry-run)",
+            "No changes will be made to the database.",
+            ""
+        ])
+
+    # Only the configuration block differs between runs
+    runner_script = "".join((
+        OPERATION_RUNNER_HEAD,
+        "PROJECT_NAME = {!r}\n".format(project_name),
+        "WRITE_ENABLED = {!r}\n".format(write_enabled),
+        # base64 is smaller than repr() escaping and decodes without a tokenizer pass
+        'OPERATIONS = base64.b64decode("{}").decode("utf-8")\n'.format(
+            base64.b64encode(operations.encode("utf-8")).decode("ascii")
+        ),
+        "MAX_MESSAGES = {!r}\n".format(MAX_REPORT_MESSAGES),
+        OPERATION_RUNNER_TAIL,
+    ))
 
     # Write to temporary file
     try:
@@ -3550,11 +4485,11 @@ if __name__ == "__main__":
             f.write(runner_script)
             temp_script_path = f.name
     except Exception as e:
-        return [TextContent(type="text", text=json.dumps({
+        return [TextContent(type="text", text=dump_json({
             "success": False,
             "error": "Failed to create temporary script: {}".format(str(e)),
             "warnings": warnings
-        }, indent=2))]
+        }))]
 
     try:
         # Create environment with UTF-8 encoding for Windows compatibility
@@ -3563,55 +4498,41 @@ if __name__ == "__main__":
         env['PYTHONUTF8'] = '1'
 
         # Run the script in a subprocess
-        result = subprocess.run(
-            [sys.executable, temp_script_path],
-            capture_output=True,
-            text=True,
-            timeout=timeout_seconds,
-            encoding='utf-8',
-            errors='replace',
-            stdin=subprocess.DEVNULL,
-            env=env
-        )
+        output = await run_runner_script([sys.executable, temp_script_path], timeout_seconds, env=env)
 
-        stdout = result.stdout
-        stderr = result.stderr
-
-        # Parse the JSON result from stdout
-        if "===FLEXTOOLS_RESULT_JSON===" in stdout:
-            json_start = stdout.index("===FLEXTOOLS_RESULT_JSON===") + len("===FLEXTOOLS_RESULT_JSON===")
-            json_str = stdout[json_start:].strip()
+        # Parse the JSON result that follows the marker
+        if output.result_json is not None:
             try:
-                execution_result = json.loads(json_str)
+                execution_result = parse_json(output.result_json.strip())
             except json.JSONDecodeError as e:
                 execution_result = {
                     "success": False,
                     "error": "Failed to parse result JSON: {}".format(str(e)),
-                    "raw_output": stdout
+                    "raw_output": output.stdout + RUNNER_RESULT_MARKER.decode() + output.result_json
                 }
         else:
             execution_result = {
                 "success": False,
                 "error": "No result marker found in output",
-                "stdout": stdout,
-                "stderr": stderr
+                "stdout": output.stdout,
+                "stderr": output.stderr
             }
 
         # Add warnings, return code, and optionally the executed code for learning
         execution_result["warnings"] = warnings
-        execution_result["exit_code"] = result.returncode
+        execution_result["exit_code"] = output.returncode
         if args.get("show_code", True):
             execution_result["code_executed"] = operations
 
         # Log operation result
         if execution_result.get("success"):
-            operations_logger.info(f"[OK] Operation completed successfully")
+            operations_logger.info("[OK] Operation completed successfully")
             summary = execution_result.get("summary", {})
-            operations_logger.info(f"Messages: {summary.get('info_count', 0)} info, {summary.get('warning_count', 0)} warnings, {summary.get('error_count', 0)} errors")
+            operations_logger.info("Messages: %s info, %s warnings, %s errors", summary.get('info_count', 0), summary.get('warning_count', 0), summary.get('error_count', 0))
             pattern_tracker.record_operation(operations, success=True)
         else:
             error_msg = execution_result.get("error", "Unknown error")
-            operations_logger.error(f"[FAIL] Operation failed: {error_msg}")
+            operations_logger.error("[FAIL] Operation failed: %s", error_msg)
             # Extract error type from traceback if present
             error_type = None
             if "AttributeError" in error_msg:
@@ -3626,7 +4547,7 @@ if __name__ == "__main__":
                 error_type = "NotFound"
             pattern_tracker.record_operation(operations, success=False, error_msg=error_msg, error_type=error_type)
 
-        operations_logger.info(f"=== Operation End ===\n")
+        operations_logger.info("=== Operation End ===\n")
 
         # Include pattern recommendations if there are patterns to avoid in this operation
         recommendations = pattern_tracker.get_recommendations()
@@ -3639,12 +4560,12 @@ if __name__ == "__main__":
         # Add session context
         execution_result = build_response_with_context(execution_result, include_session=True)
 
-        return [TextContent(type="text", text=json.dumps(execution_result, indent=2, default=str))]
+        return [TextContent(type="text", text=dump_json(execution_result))]
 
     except subprocess.TimeoutExpired:
-        operations_logger.error(f"[FAIL] Operation timed out after {timeout_seconds} seconds")
+        operations_logger.error("[FAIL] Operation timed out after %s seconds", timeout_seconds)
         pattern_tracker.record_operation(operations, success=False, error_msg="Timeout", error_type="Timeout")
-        operations_logger.info(f"=== Operation End ===\n")
+        operations_logger.info("=== Operation End ===\n")
         timeout_result = {
             "success": False,
             "error": "Execution timed out after {} seconds".format(timeout_seconds),
@@ -3652,18 +4573,18 @@ if __name__ == "__main__":
         }
         # Add session context
         timeout_result = build_response_with_context(timeout_result, include_session=True)
-        return [TextContent(type="text", text=json.dumps(timeout_result, indent=2))]
+        return [TextContent(type="text", text=dump_json(timeout_result))]
 
     except Exception as e:
         error_msg = str(e)
-        operations_logger.error(f"[FAIL] Subprocess error: {error_msg}")
+        operations_logger.error("[FAIL] Subprocess error: %s", error_msg)
         pattern_tracker.record_operation(operations, success=False, error_msg=error_msg, error_type="SubprocessError")
-        operations_logger.info(f"=== Operation End ===\n")
-        return [TextContent(type="text", text=json.dumps({
+        operations_logger.info("=== Operation End ===\n")
+        return [TextContent(type="text", text=dump_json({
             "success": False,
             "error": "Subprocess execution error: {}".format(error_msg),
             "warnings": warnings
-        }, indent=2))]
+        }))]
 
     finally:
         # Clean up temporary file
@@ -3708,7 +4629,7 @@ async def handle_get_operation_logs(args: dict) -> list[TextContent]:
 
     # Include pattern analysis
     if include_patterns:
-        pattern_tracker.load()  # Reload to get latest
+        pattern_tracker.refresh()  # Reload to get latest
         recommendations = pattern_tracker.get_recommendations()
 
         result["recommendations"] = {
@@ -3735,7 +4656,7 @@ async def handle_get_operation_logs(args: dict) -> list[TextContent]:
             "unique_error_patterns": len(pattern_tracker.patterns.get("error_patterns", {}))
         }
 
-    return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
+    return [TextContent(type="text", text=dump_json(result))]
 
 
 async def handle_resolve_property(args: dict) -> list[TextContent]:
@@ -3847,7 +4768,28 @@ async def handle_resolve_property(args: dict) -> list[TextContent]:
     # Add session context
     result = build_response_with_context(result, include_session=True)
 
-    return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
+    return [TextContent(type="text", text=dump_json(result))]
+
+
+# Tool definitions are static, so they are built once rather than per request
+TOOL_LIST = build_tool_list()
+
+# Tool name -> handler, used by call_tool
+TOOL_HANDLERS = {
+    "start": handle_start,
+    "get_object_api": handle_get_object_api,
+    "search_by_capability": handle_search_by_capability,
+    "get_navigation_path": handle_get_navigation_path,
+    "find_examples": handle_find_examples,
+    "list_categories": handle_list_categories,
+    "list_entities_in_category": handle_list_entities_in_category,
+    "get_module_template": handle_get_module_template,
+    "start_module": handle_start_module,
+    "run_module": handle_run_module,
+    "run_operation": handle_run_operation,
+    "get_operation_logs": handle_get_operation_logs,
+    "resolve_property": handle_resolve_property,
+}
 
 
 async def main():
@@ -3880,6 +4822,10 @@ async def main():
     else:
         print("[WARN] FlexLibs Stable index not found", file=__import__("sys").stderr)
 
+    # Pay the encoder's first-call cost now rather than on the first query
+    if api_index.semantic_search and api_index.semantic_search.warm_up():
+        print(f"[OK] Semantic search: {len(api_index.semantic_search.items)} items, model warmed up", file=__import__("sys").stderr)
+
     print("[INFO] Starting MCP server...", file=__import__("sys").stderr)
 
     async with stdio_server() as (read_stream, write_stream):
@@ -3887,4 +4833,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Exit normally on SIGTERM so atexit hooks (pending pattern writes) still run
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     asyncio.run(main())